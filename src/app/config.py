@@ -11,6 +11,44 @@ class Settings(BaseSettings):
     session_cookie_name: str = "session_id"
     session_ttl_seconds: int = 60 * 60 * 24 * 14  # 14 days
     cookie_secure: bool = False
+    invite_ttl_seconds: int = 60 * 60 * 24 * 7  # 7 days
+    # Shared secret for admin-only features, sent as the X-Admin-Token header.
+    admin_token: str | None = None
+
+    lobby_role_cache_ttl_seconds: int = 30
+    lobby_role_cache_max_users: int = 10_000
+
+    idempotency_ttl_seconds: int = 60 * 60 * 24  # 1 day
+    idempotency_max_entries: int = 10_000
+    idempotency_wait_seconds: float = 10.0
+
+    lobby_events_heartbeat_seconds: float = 15.0
+    lobby_events_buffer_size: int = 100
+
+    smtp_host: str = "localhost"
+    smtp_port: int = 25
+    smtp_username: str | None = None
+    smtp_password: str | None = None
+    smtp_starttls: bool = False
+    smtp_from: str = "no-reply@localhost"
+    smtp_timeout_seconds: float = 10.0
+
+    outbox_worker_enabled: bool = False
+    outbox_batch_size: int = 50
+    outbox_concurrency: int = 4
+    outbox_max_attempts: int = 5
+    outbox_lease_seconds: int = 300
+    outbox_poll_seconds: float = 2.0
+    outbox_retention_seconds: int = 60 * 60 * 24 * 7  # 7 days
+    outbox_purge_interval_seconds: float = 60 * 60
+
+    profiling_enabled: bool = False
+    profiling_sample_rate: float = 0.0
+    profiling_header: str = "X-Profile-Request"
+    profiling_interval_seconds: float = 0.005
+    profiling_max_seconds: float = 30.0
+    profiling_dir: str = "./profiles"
+    profiling_max_files: int = 200
 
 
 settings = Settings()
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-from fastapi import Cookie, Depends, HTTPException
+from fastapi import Cookie, Depends, Header, HTTPException
 from sqlalchemy.orm import Session
 
 from app.config import settings
 from app.db import get_db
-from app.models import User
-from app.security import get_user_for_session
+from app.membership import get_lobby_roles
+from app.models import Lobby, LobbyRole, User
+from app.security import ADMIN_TOKEN_HEADER, get_user_for_session, is_admin_token
 
 
 def get_current_user(
@@ -17,3 +18,27 @@ def get_current_user(
     if not user:
         raise HTTPException(status_code=401, detail="Not authenticated")
     return user
+
+
+def require_admin(admin_token: str | None = Header(default=None, alias=ADMIN_TOKEN_HEADER)) -> None:
+    if not is_admin_token(admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+def get_lobby_role(
+    lobby_id: str,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+) -> LobbyRole:
+    role = get_lobby_roles(db, user.id).get(lobby_id)
+    if role is None:
+        if not db.get(Lobby, lobby_id):
+            raise HTTPException(status_code=404, detail="Lobby not found")
+        raise HTTPException(status_code=403, detail="Not a member of this lobby")
+    return role
+
+
+def require_lobby_dm(role: LobbyRole = Depends(get_lobby_role)) -> LobbyRole:
+    if role != LobbyRole.DM:
+        raise HTTPException(status_code=403, detail="Only the lobby DM can perform this action")
+    return role
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import defaultdict
+from collections.abc import AsyncIterator, Awaitable, Callable
+
+from app.config import settings
+from app.schemas import LobbyEvent
+
+
+class Subscription:
+    def __init__(self, lobby_id: str, buffer_size: int, user_id: str | None, session_id: str | None) -> None:
+        self.lobby_id = lobby_id
+        self.user_id = user_id
+        self.session_id = session_id
+        self.loop = asyncio.get_running_loop()
+        # `None` tells the stream to close: the client fell too far behind, or lost access.
+        self.queue: asyncio.Queue[LobbyEvent | None] = asyncio.Queue(maxsize=buffer_size + 1)
+        self.buffer_size = buffer_size
+
+    def deliver(self, event: LobbyEvent) -> None:
+        """Runs on the subscriber's event loop."""
+        if self.queue.qsize() >= self.buffer_size:
+            self.close()
+            return
+        self.queue.put_nowait(event)
+
+    def close(self) -> None:
+        """Runs on the subscriber's event loop."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class LobbyEventBroadcaster:
+    """In-process fan-out of lobby events to SSE subscribers.
+
+    `publish` is called from sync endpoints running in the threadpool, so delivery is
+    handed over to each subscriber's event loop. Events only reach clients connected
+    to the same worker process.
+    """
+
+    def __init__(self, buffer_size: int) -> None:
+        self.buffer_size = buffer_size
+        self._subscriptions: defaultdict[str, set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, lobby_id: str, user_id: str | None = None, session_id: str | None = None) -> Subscription:
+        subscription = Subscription(lobby_id, self.buffer_size, user_id, session_id)
+        with self._lock:
+            self._subscriptions[lobby_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscriptions.get(subscription.lobby_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscriptions[subscription.lobby_id]
+
+    def _dispatch(self, subscribers: list[Subscription], callback: Callable[[Subscription], None]) -> None:
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(callback, subscription)
+            except RuntimeError:
+                # Loop already closed; the stream's cleanup will unsubscribe it.
+                pass
+
+    def publish(self, event: LobbyEvent) -> None:
+        with self._lock:
+            subscribers = list(self._subscriptions.get(event.lobby_id, ()))
+        self._dispatch(subscribers, lambda subscription: subscription.deliver(event))
+
+    def close_streams(
+        self,
+        *,
+        user_id: str | None = None,
+        session_id: str | None = None,
+        lobby_id: str | None = None,
+    ) -> None:
+        """Ends the open streams matching every given filter, e.g. after their session was revoked."""
+        with self._lock:
+            candidates = (
+                [s for subs in self._subscriptions.values() for s in subs]
+                if lobby_id is None
+                else list(self._subscriptions.get(lobby_id, ()))
+            )
+        matching = [
+            s
+            for s in candidates
+            if (user_id is None or s.user_id == user_id) and (session_id is None or s.session_id == session_id)
+        ]
+        self._dispatch(matching, Subscription.close)
+
+    async def stream(
+        self,
+        lobby_id: str,
+        heartbeat_seconds: float | None = None,
+        user_id: str | None = None,
+        session_id: str | None = None,
+        authorize: Callable[[], Awaitable[bool]] | None = None,
+    ) -> AsyncIterator[str]:
+        """Yields SSE chunks; `authorize` is re-checked at every heartbeat and ends the stream when it fails."""
+        heartbeat = settings.lobby_events_heartbeat_seconds if heartbeat_seconds is None else heartbeat_seconds
+        subscription = self.subscribe(lobby_id, user_id, session_id)
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+                except TimeoutError:
+                    if authorize is not None and not await authorize():
+                        return
+                    yield ": heartbeat\n\n"
+                    continue
+                if event is None:
+                    return
+                yield f"event: {event.type}\ndata: {event.model_dump_json()}\n\n"
+        finally:
+            self.unsubscribe(subscription)
+
+
+lobby_events = LobbyEventBroadcaster(buffer_size=settings.lobby_events_buffer_size)
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from collections.abc import Iterator
+from dataclasses import dataclass
+from typing import Any
+
+from pydantic import BaseModel
+from sqlalchemy import ScalarResult, select
+from sqlalchemy.orm import Session
+
+from app.models import Invite, Lobby, LobbyMember
+from app.schemas import InviteExport, LobbyExport, LobbyMemberExport
+
+EXPORT_BATCH_SIZE = 500
+
+
+class InvalidExportCursor(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class ExportSection:
+    """A lobby-scoped table included in the export, streamed in primary key order."""
+
+    name: str
+    model: Any
+    schema: type[BaseModel]
+
+
+# New lobby-scoped tables (chat, calendar, journal, map) register here; order is part of the cursor contract.
+EXPORT_SECTIONS: tuple[ExportSection, ...] = (
+    ExportSection("lobby_members", LobbyMember, LobbyMemberExport),
+    ExportSection("invites", Invite, InviteExport),
+)
+
+
+def encode_export_cursor(section: str, last_id: str) -> str:
+    raw = json.dumps([section, last_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_export_cursor(cursor: str) -> tuple[int, str]:
+    """Returns (section index, last exported id) for a cursor produced by `encode_export_cursor`."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        section, last_id = json.loads(raw)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise InvalidExportCursor(cursor) from e
+    for index, candidate in enumerate(EXPORT_SECTIONS):
+        if candidate.name == section and isinstance(last_id, str):
+            return index, last_id
+    raise InvalidExportCursor(cursor)
+
+
+def _line(record: dict[str, Any]) -> str:
+    return json.dumps(record, separators=(",", ":"), default=str) + "\n"
+
+
+def iter_lobby_export(
+    db: Session, lobby: Lobby, cursor: str | None = None, batch_size: int = EXPORT_BATCH_SIZE
+) -> Iterator[str]:
+    """Yields the lobby as NDJSON chunks, one chunk per fetched batch.
+
+    Rows are read with `yield_per` (a server-side cursor where the driver supports it) and
+    the session's identity map only holds them weakly, so memory stays flat. Rows are
+    keyset-ordered by id and every record line carries a `cursor` from which an
+    interrupted export can be resumed.
+    """
+    start_section, after_id = decode_export_cursor(cursor) if cursor else (0, None)
+    if cursor is None:
+        yield _line({"type": "lobby", "data": LobbyExport.model_validate(lobby).model_dump(mode="json")})
+
+    for index, section in enumerate(EXPORT_SECTIONS[start_section:], start=start_section):
+        stmt = select(section.model).where(section.model.lobby_id == lobby.id).order_by(section.model.id)
+        if index == start_section and after_id is not None:
+            stmt = stmt.where(section.model.id > after_id)
+        result: ScalarResult[Any] = db.execute(stmt.execution_options(yield_per=batch_size)).scalars()
+        for batch in result.partitions():
+            yield "".join(
+                _line(
+                    {
+                        "type": section.name,
+                        "cursor": encode_export_cursor(section.name, row.id),
+                        "data": section.schema.model_validate(row).model_dump(mode="json"),
+                    }
+                )
+                for row in batch
+            )
+
+    yield _line({"type": "end"})
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TypeVar
+
+from fastapi import HTTPException
+
+from app.cache import TTLCache
+from app.config import settings
+
+T = TypeVar("T")
+
+IdempotencyKey = tuple[str, str, str]
+
+
+@dataclass(frozen=True)
+class _StoredOutcome:
+    fingerprint: str
+    response: object = None
+    error: HTTPException | None = None
+
+
+class IdempotencyStore:
+    """Remembers the first outcome per (user, operation, Idempotency-Key) and replays it.
+
+    Concurrent requests with the same key wait, up to `wait_seconds`, for the one already
+    executing instead of running the operation again, then get 409. Only responses and
+    4xx errors are stored; a 5xx or an unexpected exception lets the next attempt run.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float, wait_seconds: float) -> None:
+        self._outcomes: TTLCache[IdempotencyKey, _StoredOutcome] = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+        self._in_flight: dict[IdempotencyKey, threading.Event] = {}
+        self._lock = threading.Lock()
+        self.wait_seconds = wait_seconds
+
+    def run(
+        self,
+        user_id: str,
+        operation: str,
+        key: str | None,
+        fingerprint: str,
+        response_type: type[T],
+        func: Callable[[], T],
+        before_wait: Callable[[], None] | None = None,
+    ) -> T:
+        """Runs `func` once per key.
+
+        `before_wait` is called before blocking on a duplicate, so the request can hand its
+        DB connection back to the pool while it waits.
+        """
+        if key is None:
+            return func()
+
+        cache_key = (user_id, operation, key)
+        deadline = time.monotonic() + self.wait_seconds
+        while True:
+            with self._lock:
+                stored = self._outcomes.get(cache_key)
+                running = self._in_flight.get(cache_key)
+                if stored is None and running is None:
+                    done = self._in_flight[cache_key] = threading.Event()
+                    break
+            if stored is not None:
+                return self._replay(stored, fingerprint, response_type)
+            if running is not None:
+                if before_wait is not None:
+                    before_wait()
+                    before_wait = None
+                if not running.wait(max(deadline - time.monotonic(), 0)):
+                    raise HTTPException(
+                        status_code=409,
+                        detail="A request with this Idempotency-Key is still in progress",
+                    )
+
+        try:
+            response = func()
+        except HTTPException as e:
+            if e.status_code < 500:
+                self._outcomes.set(cache_key, _StoredOutcome(fingerprint=fingerprint, error=e))
+            raise
+        else:
+            self._outcomes.set(cache_key, _StoredOutcome(fingerprint=fingerprint, response=response))
+            return response
+        finally:
+            with self._lock:
+                del self._in_flight[cache_key]
+            done.set()
+
+    @staticmethod
+    def _replay(stored: _StoredOutcome, fingerprint: str, response_type: type[T]) -> T:
+        if stored.fingerprint != fingerprint:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+        if stored.error is not None:
+            raise HTTPException(status_code=stored.error.status_code, detail=stored.error.detail)
+        if not isinstance(stored.response, response_type):
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+        return stored.response
+
+    def clear(self) -> None:
+        self._outcomes.clear()
+
+
+idempotency_store = IdempotencyStore(
+    maxsize=settings.idempotency_max_entries,
+    ttl_seconds=settings.idempotency_ttl_seconds,
+    wait_seconds=settings.idempotency_wait_seconds,
+)
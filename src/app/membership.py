@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import itertools
+import threading
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.cache import TTLCache
+from app.config import settings
+from app.models import LobbyMember, LobbyMemberStatus, LobbyRole
+
+# user_id -> {lobby_id: role} for every lobby the user is an active member of.
+lobby_role_cache: TTLCache[str, dict[str, LobbyRole]] = TTLCache(
+    maxsize=settings.lobby_role_cache_max_users,
+    ttl_seconds=settings.lobby_role_cache_ttl_seconds,
+)
+
+# user_id -> generation of its last invalidation. A load only caches its roles if the user's
+# generation is unchanged since before its SELECT, so it cannot re-cache roles an invalidation
+# dropped. Entries only need to outlive an in-flight load, so they expire with the role cache.
+_role_generations: TTLCache[str, int] = TTLCache(
+    maxsize=settings.lobby_role_cache_max_users,
+    ttl_seconds=settings.lobby_role_cache_ttl_seconds,
+)
+_generation_counter = itertools.count(1)
+_generations_lock = threading.Lock()
+
+
+def get_lobby_roles(db: Session, user_id: str) -> dict[str, LobbyRole]:
+    roles = lobby_role_cache.get(user_id)
+    if roles is not None:
+        return roles
+
+    generation = _role_generations.get(user_id)
+    stmt = select(LobbyMember.lobby_id, LobbyMember.is_dm).where(
+        LobbyMember.user_id == user_id,
+        LobbyMember.status == LobbyMemberStatus.ACTIVE,
+    )
+    roles = {lobby_id: LobbyRole.DM if is_dm else LobbyRole.PLAYER for lobby_id, is_dm in db.execute(stmt).all()}
+    with _generations_lock:
+        if _role_generations.get(user_id) == generation:
+            lobby_role_cache.set(user_id, roles)
+    return roles
+
+
+def invalidate_lobby_roles(*user_ids: str | None) -> None:
+    """Drop cached roles; call after committing any `LobbyMember` write for these users."""
+    for user_id in user_ids:
+        if user_id:
+            with _generations_lock:
+                _role_generations.set(user_id, next(_generation_counter))
+                lobby_role_cache.pop(user_id)
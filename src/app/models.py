@@ -4,7 +4,7 @@ import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, Index, String
+from sqlalchemy import Boolean, DateTime, Enum, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db import Base
@@ -24,6 +24,17 @@ class LobbyMemberStatus(enum.StrEnum):
     INVITED = "invited"
 
 
+class OutboxStatus(enum.StrEnum):
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class LobbyRole(enum.StrEnum):
+    DM = "dm"
+    PLAYER = "player"
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -52,6 +63,9 @@ class Session(Base):
     user: Mapped[User] = relationship(back_populates="sessions")
 
 
+Index("ix_sessions_user_id_revoked_at", Session.user_id, Session.revoked_at)
+
+
 class Lobby(Base):
     __tablename__ = "lobbies"
 
@@ -82,6 +96,8 @@ class LobbyMember(Base):
 
 
 Index("ix_lobby_members_lobby_user_unique", LobbyMember.lobby_id, LobbyMember.user_id, unique=True)
+Index("ix_lobby_members_user_id", LobbyMember.user_id)
+Index("ix_lobby_members_lobby_id_id", LobbyMember.lobby_id, LobbyMember.id)
 Index(
     "ix_lobby_members_lobby_target_email_unique",
     LobbyMember.lobby_id,
@@ -107,3 +123,24 @@ class Invite(Base):
 
 
 Index("ix_invites_token_hash_unique", Invite.token_hash, unique=True)
+Index("ix_invites_lobby_id_id", Invite.lobby_id, Invite.id)
+
+
+class OutboxMessage(Base):
+    __tablename__ = "outbox_messages"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    recipient: Mapped[str] = mapped_column(String(320), nullable=False)
+    subject: Mapped[str] = mapped_column(String(200), nullable=False)
+    # Holds the raw invite token, so it is cleared once the message is sent or has failed for good.
+    body: Mapped[str | None] = mapped_column(Text, nullable=True)
+    status: Mapped[OutboxStatus] = mapped_column(Enum(OutboxStatus), nullable=False, default=OutboxStatus.PENDING)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Next time a worker may claim the row; claiming pushes it forward as a lease.
+    available_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow, nullable=False)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utcnow, nullable=False)
+
+
+Index("ix_outbox_messages_status_available_at", OutboxMessage.status, OutboxMessage.available_at)
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import smtplib
+import threading
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import Any, NamedTuple, cast
+
+from sqlalchemy import CursorResult, and_, delete, or_, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from app.models import OutboxMessage, OutboxStatus
+
+logger = logging.getLogger(__name__)
+
+INVITE_EMAIL_BODY = """You have been invited to join a lobby.
+
+Accept the invite and create your account here:
+{invite_url}
+"""
+
+
+class ClaimedMessage(NamedTuple):
+    id: str
+    recipient: str
+    subject: str
+    body: str | None
+    attempts: int
+    # The lease this claim holds; results are only recorded while it is still the row's lease.
+    leased_until: datetime
+
+
+def enqueue_invite_email(db: Session, target_email: str, invite_url: str) -> OutboxMessage:
+    """Adds the invite email to the outbox; the caller commits it together with the `Invite`."""
+    message = OutboxMessage(
+        recipient=target_email,
+        subject="You have been invited to an Open Table RPG lobby",
+        body=INVITE_EMAIL_BODY.format(invite_url=invite_url),
+    )
+    db.add(message)
+    return message
+
+
+def claim_outbox_batch(db: Session, batch_size: int, lease_seconds: int, max_attempts: int) -> list[ClaimedMessage]:
+    now = datetime.utcnow()
+    leased_until = now + timedelta(seconds=lease_seconds)
+    # SKIP LOCKED lets concurrent workers on Postgres take disjoint batches; dialects
+    # without row locks fall back to the conditional UPDATE below to avoid double claims.
+    # Rows whose attempts ran out without a recorded result (e.g. the worker died) are not retried.
+    candidates_stmt = (
+        select(OutboxMessage.id)
+        .where(
+            OutboxMessage.status == OutboxStatus.PENDING,
+            OutboxMessage.available_at <= now,
+            OutboxMessage.attempts < max_attempts,
+        )
+        .order_by(OutboxMessage.available_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    ids = db.execute(candidates_stmt).scalars().all()
+    if not ids:
+        db.rollback()
+        return []
+
+    claim_stmt = (
+        update(OutboxMessage)
+        .where(
+            OutboxMessage.id.in_(ids),
+            OutboxMessage.status == OutboxStatus.PENDING,
+            OutboxMessage.available_at <= now,
+            OutboxMessage.attempts < max_attempts,
+        )
+        .values(available_at=leased_until, attempts=OutboxMessage.attempts + 1)
+        .returning(
+            OutboxMessage.id,
+            OutboxMessage.recipient,
+            OutboxMessage.subject,
+            OutboxMessage.body,
+            OutboxMessage.attempts,
+            OutboxMessage.available_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    claimed = [ClaimedMessage(*row) for row in db.execute(claim_stmt).all()]
+    db.commit()
+    return claimed
+
+
+def record_outbox_result(db: Session, message: ClaimedMessage, error: str | None, max_attempts: int) -> bool:
+    """Records one delivery outcome; returns False if the lease lapsed and another claim owns the row."""
+    now = datetime.utcnow()
+    values: dict[str, object]
+    if error is None:
+        values = {"status": OutboxStatus.SENT, "sent_at": now, "last_error": None, "body": None}
+    else:
+        values = {"last_error": error[:1000]}
+        if message.attempts >= max_attempts:
+            values["status"] = OutboxStatus.FAILED
+            values["body"] = None
+        else:
+            values["available_at"] = now + timedelta(seconds=2**message.attempts)
+    stmt = (
+        update(OutboxMessage)
+        .where(
+            OutboxMessage.id == message.id,
+            OutboxMessage.status == OutboxStatus.PENDING,
+            OutboxMessage.available_at == message.leased_until,
+        )
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    recorded = cast(CursorResult[Any], db.execute(stmt)).rowcount == 1
+    db.commit()
+    if not recorded:
+        logger.warning("outbox lease on %s lapsed before its result was recorded", message.id)
+    return recorded
+
+
+def purge_finished_outbox(db: Session, older_than_seconds: int, expire_after_seconds: int) -> int:
+    """Deletes finished messages past retention and any message past the invite TTL; returns how many."""
+    now = datetime.utcnow()
+    # A message older than its invite carries a dead link, so even unsent ones are dropped.
+    stmt = delete(OutboxMessage).where(
+        or_(
+            and_(
+                OutboxMessage.status.in_([OutboxStatus.SENT, OutboxStatus.FAILED]),
+                OutboxMessage.created_at < now - timedelta(seconds=older_than_seconds),
+            ),
+            OutboxMessage.created_at < now - timedelta(seconds=expire_after_seconds),
+        )
+    )
+    purged = cast(CursorResult[Any], db.execute(stmt)).rowcount
+    db.commit()
+    return purged
+
+
+def _connect_smtp() -> smtplib.SMTP:
+    conn = smtplib.SMTP(settings.smtp_host, settings.smtp_port, timeout=settings.smtp_timeout_seconds)
+    if settings.smtp_starttls:
+        conn.starttls()
+    if settings.smtp_username and settings.smtp_password:
+        conn.login(settings.smtp_username, settings.smtp_password)
+    return conn
+
+
+class SmtpPool:
+    """Reuses up to `size` SMTP connections; at most `size` messages are in flight at once."""
+
+    def __init__(self, size: int, connect: Callable[[], smtplib.SMTP] = _connect_smtp) -> None:
+        self._connect = connect
+        self._semaphore = asyncio.Semaphore(size)
+        self._idle: list[smtplib.SMTP] = []
+        self._lock = threading.Lock()
+
+    async def send(self, message: EmailMessage) -> None:
+        async with self._semaphore:
+            await asyncio.to_thread(self._send_blocking, message)
+
+    def _send_blocking(self, message: EmailMessage) -> None:
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is not None:
+            try:
+                self._send_on(conn, message)
+                return
+            except smtplib.SMTPServerDisconnected:
+                # Idle connection was dropped by the server; retry once on a fresh one.
+                pass
+        self._send_on(self._connect(), message)
+
+    def _send_on(self, conn: smtplib.SMTP, message: EmailMessage) -> None:
+        try:
+            conn.send_message(message)
+        except smtplib.SMTPRecipientsRefused:
+            # smtplib resets the transaction after a refusal, so the connection is still usable.
+            self._release(conn)
+            raise
+        except Exception:
+            self._discard(conn)
+            raise
+        self._release(conn)
+
+    def _release(self, conn: smtplib.SMTP) -> None:
+        with self._lock:
+            self._idle.append(conn)
+
+    @staticmethod
+    def _discard(conn: smtplib.SMTP) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            try:
+                conn.quit()
+            except Exception:
+                self._discard(conn)
+
+
+class OutboxWorker:
+    def __init__(self, session_factory: sessionmaker[Session], pool: SmtpPool | None = None) -> None:
+        # A batch is sent `concurrency` messages at a time and each send may reconnect once;
+        # a lease shorter than that would let another worker re-claim and resend the tail.
+        rounds = math.ceil(settings.outbox_batch_size / settings.outbox_concurrency)
+        worst_case_seconds = rounds * 2 * settings.smtp_timeout_seconds
+        if settings.outbox_lease_seconds <= worst_case_seconds:
+            raise ValueError(
+                f"outbox_lease_seconds ({settings.outbox_lease_seconds}) must exceed the worst-case "
+                f"batch delivery time ({worst_case_seconds:g}s)"
+            )
+        self.session_factory = session_factory
+        self.pool = pool or SmtpPool(settings.outbox_concurrency)
+
+    def _claim(self) -> list[ClaimedMessage]:
+        with self.session_factory() as db:
+            return claim_outbox_batch(
+                db, settings.outbox_batch_size, settings.outbox_lease_seconds, settings.outbox_max_attempts
+            )
+
+    def _purge(self) -> int:
+        with self.session_factory() as db:
+            return purge_finished_outbox(db, settings.outbox_retention_seconds, settings.invite_ttl_seconds)
+
+    def _record(self, message: ClaimedMessage, error: str | None) -> None:
+        with self.session_factory() as db:
+            record_outbox_result(db, message, error, settings.outbox_max_attempts)
+
+    async def _deliver(self, message: ClaimedMessage) -> None:
+        email = EmailMessage()
+        email["From"] = settings.smtp_from
+        email["To"] = message.recipient
+        email["Subject"] = message.subject
+        email.set_content(message.body or "")
+        error = None
+        try:
+            await self.pool.send(email)
+        except (smtplib.SMTPException, OSError) as e:
+            logger.warning("outbox delivery of %s failed (attempt %d): %s", message.id, message.attempts, e)
+            error = repr(e)
+        # Recorded per message, so a slow tail does not delay the results of the rest of the batch.
+        await asyncio.to_thread(self._record, message, error)
+
+    async def run_once(self) -> int:
+        """Claims and delivers one batch; returns how many messages were claimed."""
+        claimed = await asyncio.to_thread(self._claim)
+        if not claimed:
+            return 0
+        await asyncio.gather(*(self._deliver(message) for message in claimed))
+        return len(claimed)
+
+    async def run(self, stop: asyncio.Event) -> None:
+        loop = asyncio.get_running_loop()
+        next_purge_at = loop.time()
+        try:
+            while not stop.is_set():
+                try:
+                    if loop.time() >= next_purge_at:
+                        await asyncio.to_thread(self._purge)
+                        next_purge_at = loop.time() + settings.outbox_purge_interval_seconds
+                    claimed = await self.run_once()
+                except Exception:
+                    logger.exception("outbox worker iteration failed")
+                    claimed = 0
+                if claimed < settings.outbox_batch_size:
+                    try:
+                        await asyncio.wait_for(stop.wait(), timeout=settings.outbox_poll_seconds)
+                    except TimeoutError:
+                        pass
+        finally:
+            await asyncio.to_thread(self.pool.close)
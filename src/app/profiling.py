@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import os
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterable
+from pathlib import Path
+from types import FrameType
+from typing import Any
+
+import fastapi
+
+import app as app_package
+from app.config import settings
+from app.security import ADMIN_TOKEN_HEADER, is_admin_token
+
+# Only stacks passing through our code or FastAPI are kept; idle workers and the
+# event loop waiting in `selectors` are dropped.
+DEFAULT_ROOTS = (
+    os.path.dirname(os.path.abspath(app_package.__file__)),
+    os.path.dirname(os.path.abspath(fastapi.__file__)),
+)
+
+# Streaming responses can stay open for hours; their profile ends once the headers are sent.
+STREAMING_MEDIA_TYPES = (b"text/event-stream", b"application/x-ndjson")
+
+_rotation_lock = threading.Lock()
+# Held by the one running sampler; requests selected while it is taken are not profiled.
+_sampler_slot = threading.Lock()
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+class StackSampler:
+    """Samples every other thread's stack at a fixed interval and writes them as collapsed stacks.
+
+    Stacks cover the whole process, not just the triggering request: anything else running
+    in the threadpool during the window is included. At most one sampler runs at a time so
+    the overhead stays that of a single sampling thread, and each one stops itself after
+    `max_seconds` so a long request cannot hold the slot.
+
+    The output is Brendan Gregg's folded format (`frame;frame;frame count`), which
+    flamegraph.pl and speedscope open directly.
+    """
+
+    def __init__(
+        self,
+        output_path: Path,
+        interval_seconds: float,
+        roots: Iterable[str],
+        max_seconds: float | None = None,
+    ) -> None:
+        self.output_path = output_path
+        self.interval_seconds = interval_seconds
+        self.max_seconds = max_seconds
+        self.roots = tuple(roots)
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def try_start(self) -> bool:
+        """Starts sampling unless another sampler is already running."""
+        if not _sampler_slot.acquire(blocking=False):
+            return False
+        try:
+            self._thread.start()
+        except BaseException:
+            _sampler_slot.release()
+            raise
+        return True
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def join(self, timeout: float | None = None) -> None:
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        try:
+            own_id = threading.get_ident()
+            deadline = None if self.max_seconds is None else time.monotonic() + self.max_seconds
+            while not self._stop.wait(self.interval_seconds):
+                self._sample(own_id)
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+        finally:
+            _sampler_slot.release()
+        self._write()
+
+    def _sample(self, own_id: int) -> None:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            labels: list[str] = []
+            relevant = False
+            current: FrameType | None = frame
+            while current is not None:
+                relevant = relevant or current.f_code.co_filename.startswith(self.roots)
+                labels.append(_frame_label(current))
+                current = current.f_back
+            if relevant:
+                labels.reverse()
+                self.stacks[";".join(labels)] += 1
+
+    def _write(self) -> None:
+        if not self.stacks:
+            return
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        lines = (f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+        self.output_path.write_text("".join(lines), encoding="utf-8")
+        rotate_profiles(self.output_path.parent, settings.profiling_max_files)
+
+
+def rotate_profiles(directory: Path, max_files: int) -> None:
+    with _rotation_lock:
+        profiles = sorted(directory.glob("*.folded"), key=lambda p: p.stat().st_mtime)
+        for stale in profiles[: max(len(profiles) - max_files, 0)]:
+            stale.unlink(missing_ok=True)
+
+
+def _is_streaming(message: dict[str, Any]) -> bool:
+    content_type: bytes = dict(message.get("headers", ())).get(b"content-type", b"")
+    return content_type.startswith(STREAMING_MEDIA_TYPES)
+
+
+class ProfilingMiddleware:
+    """Profiles a random sample of HTTP requests, plus admin requests that ask for it.
+
+    An admin opts a request in by sending the profiling header along with a valid
+    `X-Admin-Token` (the same `settings.admin_token` that guards the admin API).
+
+    Each profile lasts at most `settings.profiling_max_seconds`, and streaming responses
+    (SSE, NDJSON) are only profiled until their headers are sent. Requests selected while
+    another profile is being taken are skipped. Only installed when
+    `settings.profiling_enabled` is set, so it costs nothing otherwise.
+    """
+
+    def __init__(
+        self,
+        app: Any,
+        sample_rate: float | None = None,
+        output_dir: str | None = None,
+        roots: Iterable[str] = DEFAULT_ROOTS,
+    ) -> None:
+        self.app = app
+        self.sample_rate = settings.profiling_sample_rate if sample_rate is None else sample_rate
+        self.output_dir = Path(output_dir or settings.profiling_dir)
+        self.roots = tuple(roots)
+        self._header = settings.profiling_header.lower().encode("latin-1")
+        self._admin_header = ADMIN_TOKEN_HEADER.lower().encode("latin-1")
+
+    def _should_profile(self, scope: dict[str, Any]) -> bool:
+        headers = dict(scope.get("headers", ()))
+        if self._header in headers:
+            admin_token = headers.get(self._admin_header)
+            if admin_token is not None and is_admin_token(admin_token.decode("latin-1")):
+                return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+        filename = f"{time.strftime('%Y%m%dT%H%M%S')}-{scope['method']}-{slug}-{secrets.token_hex(4)}.folded"
+        sampler = StackSampler(
+            self.output_dir / filename,
+            settings.profiling_interval_seconds,
+            self.roots,
+            max_seconds=settings.profiling_max_seconds,
+        )
+        if not sampler.try_start():
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: dict[str, Any]) -> None:
+            if message["type"] == "http.response.start" and _is_streaming(message):
+                sampler.stop()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The sampler thread writes and rotates the file itself, off the event loop.
+            sampler.stop()
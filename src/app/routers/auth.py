@@ -7,14 +7,15 @@ from sqlalchemy.orm import Session
 
 from app.config import settings
 from app.db import get_db
-from app.deps import get_current_user
+from app.deps import get_current_user, require_admin
 from app.models import AccountType, User
-from app.schemas import GMRegisterRequest, LoginRequest, WhoAmIResponse
+from app.schemas import GMRegisterRequest, LoginRequest, SessionsRevokedResponse, WhoAmIResponse
 from app.security import (
     create_session,
     hash_password,
     normalize_email,
     revoke_session,
+    revoke_user_sessions,
     verify_password,
 )
 
@@ -82,6 +83,28 @@ def logout(
     return {"status": "ok"}
 
 
+@router.post("/logout/all", response_model=SessionsRevokedResponse)
+def logout_all(
+    response: Response,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+) -> SessionsRevokedResponse:
+    revoked = revoke_user_sessions(db, user.id)
+    response.delete_cookie(key=settings.session_cookie_name, path="/")
+    return SessionsRevokedResponse(revoked_sessions=revoked)
+
+
+@router.post(
+    "/admin/users/{user_id}/sessions/revoke",
+    response_model=SessionsRevokedResponse,
+    dependencies=[Depends(require_admin)],
+)
+def admin_revoke_user_sessions(user_id: str, db: Session = Depends(get_db)) -> SessionsRevokedResponse:
+    if not db.get(User, user_id):
+        raise HTTPException(status_code=404, detail="User not found")
+    return SessionsRevokedResponse(revoked_sessions=revoke_user_sessions(db, user_id))
+
+
 @router.get("/whoami", response_model=WhoAmIResponse)
 def whoami(user: User = Depends(get_current_user)) -> WhoAmIResponse:
     return WhoAmIResponse(
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime
+from typing import Any, cast
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import CursorResult, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import get_db
+from app.events import lobby_events
+from app.membership import invalidate_lobby_roles
+from app.models import AccountType, Invite, LobbyMember, LobbyMemberStatus, User
+from app.schemas import InviteAcceptRequest, LobbyEvent, LobbyMemberResponse, WhoAmIResponse
+from app.security import create_session, hash_password, normalize_email
+
+router = APIRouter(prefix="/api/invites", tags=["invites"])
+
+
+@router.post("/accept", status_code=201, response_model=WhoAmIResponse)
+def accept_email_invite(
+    payload: InviteAcceptRequest,
+    response: Response,
+    token: str = Query(min_length=1),
+    db: Session = Depends(get_db),
+) -> WhoAmIResponse:
+    email = normalize_email(str(payload.email))
+    token_hash = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    # Hash before touching the DB so the write transaction below stays short.
+    password_hash = hash_password(payload.password)
+    now = datetime.utcnow()
+
+    # Consume the invite with a single conditional UPDATE: concurrent clicks on the same
+    # link race on the row lock, and only the first one sees `used_at IS NULL`.
+    consume_stmt = (
+        update(Invite)
+        .where(
+            Invite.token_hash == token_hash,
+            Invite.target_email == email,
+            Invite.used_at.is_(None),
+            Invite.expires_at > now,
+        )
+        .values(used_at=now)
+        .returning(Invite.lobby_id)
+        .execution_options(synchronize_session=False)
+    )
+    lobby_id = db.execute(consume_stmt).scalar_one_or_none()
+    if lobby_id is None:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Invite not found, expired or already used")
+
+    user = User(
+        email=email,
+        password_hash=password_hash,
+        display_name=payload.display_name,
+        account_type=AccountType.PLAYER,
+    )
+    db.add(user)
+    try:
+        db.flush()
+    except IntegrityError as e:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Email already exists") from e
+
+    user_id = user.id
+    promote_stmt = (
+        update(LobbyMember)
+        .where(
+            LobbyMember.lobby_id == lobby_id,
+            LobbyMember.target_email == email,
+            LobbyMember.status == LobbyMemberStatus.INVITED,
+        )
+        .values(status=LobbyMemberStatus.ACTIVE, user_id=user_id)
+        .execution_options(synchronize_session=False)
+    )
+    if cast(CursorResult[Any], db.execute(promote_stmt)).rowcount != 1:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Lobby membership is no longer pending")
+    db.commit()
+    invalidate_lobby_roles(user_id)
+    lobby_events.publish(
+        LobbyEvent(
+            type="member_joined",
+            lobby_id=lobby_id,
+            member=LobbyMemberResponse(
+                user_id=user_id,
+                target_email=email,
+                status=LobbyMemberStatus.ACTIVE,
+                is_dm=False,
+            ),
+        )
+    )
+
+    sess = create_session(db, user)
+    response.set_cookie(
+        key=settings.session_cookie_name,
+        value=sess.id,
+        httponly=True,
+        samesite="lax",
+        secure=settings.cookie_secure,
+        max_age=settings.session_ttl_seconds,
+        path="/",
+    )
+    return WhoAmIResponse(
+        user_id=user.id,
+        email=user.email,
+        display_name=user.display_name,
+        account_type=user.account_type,
+    )
@@ -1,25 +1,34 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import secrets
 from collections.abc import Sequence
 from datetime import datetime, timedelta
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Cookie, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.db import get_db
-from app.deps import get_current_user
-from app.models import AccountType, Invite, Lobby, LobbyMember, LobbyMemberStatus, User
+from app.config import settings
+from app.db import SessionLocal, get_db
+from app.deps import get_current_user, get_lobby_role, require_lobby_dm
+from app.events import lobby_events
+from app.export import InvalidExportCursor, decode_export_cursor, iter_lobby_export
+from app.idempotency import idempotency_store
+from app.membership import get_lobby_roles, invalidate_lobby_roles
+from app.models import AccountType, Invite, Lobby, LobbyMember, LobbyMemberStatus, LobbyRole, User
+from app.outbox import enqueue_invite_email
 from app.schemas import (
     EmailInviteCreateRequest,
     EmailInviteCreateResponse,
     LobbyCreateRequest,
     LobbyDetailResponse,
+    LobbyEvent,
     LobbyMemberResponse,
 )
-from app.security import normalize_email
+from app.security import get_user_for_session, normalize_email
 
 router = APIRouter(prefix="/api/lobbies", tags=["lobbies"])
 
@@ -50,7 +59,20 @@ def create_lobby(
     payload: LobbyCreateRequest,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key", max_length=255),
 ) -> LobbyDetailResponse:
+    return idempotency_store.run(
+        user.id,
+        "create_lobby",
+        idempotency_key,
+        payload.model_dump_json(),
+        LobbyDetailResponse,
+        lambda: _create_lobby(payload, db, user),
+        before_wait=db.rollback,
+    )
+
+
+def _create_lobby(payload: LobbyCreateRequest, db: Session, user: User) -> LobbyDetailResponse:
     if user.account_type != AccountType.GM:
         raise HTTPException(status_code=403, detail="Only GMs can create lobbies")
 
@@ -67,6 +89,7 @@ def create_lobby(
     )
     db.add(dm_member)
     db.commit()
+    invalidate_lobby_roles(user.id)
 
     db.refresh(lobby)
     db.refresh(dm_member)
@@ -77,26 +100,65 @@ def create_lobby(
 def get_lobby_details(
     lobby_id: str,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    _role: LobbyRole = Depends(get_lobby_role),
 ) -> LobbyDetailResponse:
     lobby = db.get(Lobby, lobby_id)
     if not lobby:
         raise HTTPException(status_code=404, detail="Lobby not found")
 
-    membership_stmt = select(LobbyMember).where(
-        LobbyMember.lobby_id == lobby_id,
-        LobbyMember.user_id == user.id,
-    )
-    membership = db.execute(membership_stmt).scalars().first()
-    if not membership:
-        raise HTTPException(status_code=403, detail="Not a member of this lobby")
-
     members_stmt = select(LobbyMember).where(LobbyMember.lobby_id == lobby_id)
     members = db.execute(members_stmt).scalars().all()
 
     return _to_lobby_detail_response(lobby, members)
 
 
+def _still_authorized(session_id: str, user_id: str, lobby_id: str) -> bool:
+    with SessionLocal() as db:
+        user = get_user_for_session(db, session_id)
+        return user is not None and user.id == user_id and lobby_id in get_lobby_roles(db, user_id)
+
+
+@router.get("/{lobby_id}/events", response_class=StreamingResponse)
+async def get_lobby_events(
+    lobby_id: str,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+    _role: LobbyRole = Depends(get_lobby_role),
+    session_id: str | None = Cookie(default=None, alias=settings.session_cookie_name),
+) -> StreamingResponse:
+    user_id = user.id
+    # The stream can stay open for hours; give the pooled connection back now instead of at teardown.
+    db.close()
+
+    async def authorize() -> bool:
+        return await asyncio.to_thread(_still_authorized, session_id or "", user_id, lobby_id)
+
+    return StreamingResponse(
+        lobby_events.stream(lobby_id, user_id=user_id, session_id=session_id, authorize=authorize),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/{lobby_id}/export", response_class=StreamingResponse)
+def export_lobby(
+    lobby_id: str,
+    cursor: str | None = Query(default=None, max_length=1000),
+    db: Session = Depends(get_db),
+    _role: LobbyRole = Depends(require_lobby_dm),
+) -> StreamingResponse:
+    lobby = db.get(Lobby, lobby_id)
+    if not lobby:
+        raise HTTPException(status_code=404, detail="Lobby not found")
+    if cursor is not None:
+        try:
+            decode_export_cursor(cursor)
+        except InvalidExportCursor as e:
+            raise HTTPException(status_code=400, detail="Invalid export cursor") from e
+
+    return StreamingResponse(iter_lobby_export(db, lobby, cursor), media_type="application/x-ndjson")
+
+
 @router.post("/{lobby_id}/invites/email", status_code=201, response_model=EmailInviteCreateResponse)
 def create_email_invite(
     lobby_id: str,
@@ -104,20 +166,27 @@ def create_email_invite(
     request: Request,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
+    _role: LobbyRole = Depends(require_lobby_dm),
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key", max_length=255),
 ) -> EmailInviteCreateResponse:
-    lobby = db.get(Lobby, lobby_id)
-    if not lobby:
-        raise HTTPException(status_code=404, detail="Lobby not found")
-
-    dm_membership_stmt = select(LobbyMember).where(
-        LobbyMember.lobby_id == lobby_id,
-        LobbyMember.user_id == user.id,
-        LobbyMember.is_dm.is_(True),
+    return idempotency_store.run(
+        user.id,
+        "create_email_invite",
+        idempotency_key,
+        f"{lobby_id}:{payload.model_dump_json()}",
+        EmailInviteCreateResponse,
+        lambda: _create_email_invite(lobby_id, payload, request, db, user),
+        before_wait=db.rollback,
     )
-    dm_membership = db.execute(dm_membership_stmt).scalars().first()
-    if not dm_membership:
-        raise HTTPException(status_code=403, detail="Only the lobby DM can create invites")
 
+
+def _create_email_invite(
+    lobby_id: str,
+    payload: EmailInviteCreateRequest,
+    request: Request,
+    db: Session,
+    user: User,
+) -> EmailInviteCreateResponse:
     target_email = normalize_email(str(payload.target_email))
     existing_user = db.execute(select(User).where(User.email == target_email)).scalars().first()
     if existing_user:
@@ -131,6 +200,7 @@ def create_email_invite(
         LobbyMember.target_email == target_email,
     )
     member = db.execute(member_stmt).scalars().first()
+    previous_user_id = member.user_id if member else None
     if member:
         member.status = LobbyMemberStatus.INVITED
         member.user_id = None
@@ -152,12 +222,31 @@ def create_email_invite(
         created_by_user_id=user.id,
         target_email=target_email,
         token_hash=token_hash,
-        expires_at=datetime.utcnow() + timedelta(days=7),
+        expires_at=datetime.utcnow() + timedelta(seconds=settings.invite_ttl_seconds),
         used_at=None,
     )
     db.add(invite)
-    db.commit()
 
     base_url = str(request.base_url).rstrip("/")
     invite_url = f"{base_url}/api/invites/accept?token={raw_token}"
-    return EmailInviteCreateResponse(invite_url=invite_url, expires_in_seconds=7 * 24 * 60 * 60)
+    # The email body carries the raw token; only queue it when a worker will send and clear it.
+    if settings.outbox_worker_enabled:
+        enqueue_invite_email(db, target_email, invite_url)
+    db.commit()
+    invalidate_lobby_roles(previous_user_id)
+    if previous_user_id:
+        lobby_events.close_streams(user_id=previous_user_id, lobby_id=lobby_id)
+    lobby_events.publish(
+        LobbyEvent(
+            type="member_invited",
+            lobby_id=lobby_id,
+            member=LobbyMemberResponse(
+                user_id=None,
+                target_email=target_email,
+                status=LobbyMemberStatus.INVITED,
+                is_dm=False,
+            ),
+        )
+    )
+
+    return EmailInviteCreateResponse(invite_url=invite_url, expires_in_seconds=settings.invite_ttl_seconds)
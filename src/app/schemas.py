@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from pydantic import BaseModel, EmailStr, Field
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
 from app.models import AccountType, LobbyMemberStatus
 
@@ -11,6 +14,12 @@ class GMRegisterRequest(BaseModel):
     display_name: str = Field(min_length=1, max_length=100)
 
 
+class InviteAcceptRequest(BaseModel):
+    email: EmailStr
+    password: str = Field(min_length=8, max_length=256)
+    display_name: str = Field(min_length=1, max_length=100)
+
+
 class LoginRequest(BaseModel):
     email: EmailStr
     password: str = Field(min_length=1, max_length=256)
@@ -23,6 +32,10 @@ class WhoAmIResponse(BaseModel):
     account_type: AccountType
 
 
+class SessionsRevokedResponse(BaseModel):
+    revoked_sessions: int
+
+
 class LobbyCreateRequest(BaseModel):
     name: str = Field(min_length=1, max_length=100)
 
@@ -34,6 +47,12 @@ class LobbyMemberResponse(BaseModel):
     is_dm: bool
 
 
+class LobbyEvent(BaseModel):
+    type: Literal["member_invited", "member_joined"]
+    lobby_id: str
+    member: LobbyMemberResponse
+
+
 class LobbyDetailResponse(BaseModel):
     id: str
     name: str
@@ -48,3 +67,34 @@ class EmailInviteCreateRequest(BaseModel):
 class EmailInviteCreateResponse(BaseModel):
     invite_url: str
     expires_in_seconds: int
+
+
+class LobbyExport(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    name: str
+    created_by_user_id: str
+    created_at: datetime
+
+
+class LobbyMemberExport(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    user_id: str | None
+    target_email: str | None
+    status: LobbyMemberStatus
+    is_dm: bool
+    created_at: datetime
+
+
+class InviteExport(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    created_by_user_id: str
+    target_email: str
+    expires_at: datetime
+    used_at: datetime | None
+    created_at: datetime
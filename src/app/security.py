@@ -1,18 +1,24 @@
 from __future__ import annotations
 
+import secrets
 from datetime import datetime, timedelta
+from typing import Any, cast
 
 from argon2 import PasswordHasher
 from argon2.exceptions import InvalidHash, VerificationError, VerifyMismatchError
-from sqlalchemy import select
+from sqlalchemy import CursorResult, select, update
 from sqlalchemy.orm import Session
 
 from app.config import settings
+from app.events import lobby_events
+from app.membership import invalidate_lobby_roles
 from app.models import Session as DbSession
 from app.models import User
 
 password_hasher = PasswordHasher()
 
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+
 
 def normalize_email(email: str) -> str:
     return email.strip().lower()
@@ -29,6 +35,12 @@ def verify_password(password: str, password_hash: str) -> bool:
         return False
 
 
+def is_admin_token(token: str | None) -> bool:
+    if not settings.admin_token or not token:
+        return False
+    return secrets.compare_digest(token.encode("utf-8"), settings.admin_token.encode("utf-8"))
+
+
 def create_session(db: Session, user: User) -> DbSession:
     now = datetime.utcnow()
     sess = DbSession(
@@ -49,6 +61,24 @@ def revoke_session(db: Session, session_id: str) -> None:
     sess.revoked_at = now
     db.add(sess)
     db.commit()
+    lobby_events.close_streams(session_id=session_id)
+
+
+def revoke_user_sessions(db: Session, user_id: str) -> int:
+    """Revokes every live session of the user in one statement; returns how many were revoked."""
+    now = datetime.utcnow()
+    stmt = (
+        update(DbSession)
+        .where(DbSession.user_id == user_id, DbSession.revoked_at.is_(None))
+        .values(revoked_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    revoked = cast(CursorResult[Any], db.execute(stmt)).rowcount
+    db.commit()
+    # Sessions themselves are looked up per request; drop the cached authorization state too.
+    invalidate_lobby_roles(user_id)
+    lobby_events.close_streams(user_id=user_id)
+    return revoked
 
 
 def get_user_for_session(db: Session, session_id: str) -> User | None:
@@ -0,0 +1,204 @@
+"""Bulk data seeder for load and query-plan testing.
+
+Run from `src/` against the configured database, e.g.::
+
+    OTRPG_DATABASE_URL=postgresql://... python -m app.seed --users 1000000 --sessions 5000000 --lobbies 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import random
+import uuid
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import Engine, insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import Base, engine
+from app.models import AccountType, Invite, Lobby, LobbyMember, LobbyMemberStatus, User
+from app.models import Session as DbSession
+from app.security import hash_password
+
+logger = logging.getLogger(__name__)
+
+SEED_PASSWORD = "seed-password"
+
+_USER, _SESSION, _LOBBY, _MEMBER, _INVITE = range(1, 6)
+
+
+def seed_id(kind: int, index: int) -> str:
+    """Deterministic UUID per (kind, index), so rows can reference each other without keeping ids in memory."""
+    return str(uuid.UUID(int=(kind << 96) | index))
+
+
+def seed_email(index: int) -> str:
+    return f"user{index}@seed.example"
+
+
+def gm_count_for(users: int) -> int:
+    return max(1, users // 20)
+
+
+def _batched(rows: Iterator[dict[str, Any]], batch_size: int) -> Iterator[list[dict[str, Any]]]:
+    batch: list[dict[str, Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _user_rows(users: int, now: datetime) -> Iterator[dict[str, Any]]:
+    # Argon2 is deliberately slow: hash once and share it, every seeded user logs in with SEED_PASSWORD.
+    password_hash = hash_password(SEED_PASSWORD)
+    gm_count = gm_count_for(users)
+    for i in range(users):
+        yield {
+            "id": seed_id(_USER, i),
+            "email": seed_email(i),
+            "password_hash": password_hash,
+            "display_name": f"User {i}",
+            "account_type": AccountType.GM if i < gm_count else AccountType.PLAYER,
+            "created_at": now,
+        }
+
+
+def _session_rows(sessions: int, users: int, rng: random.Random, now: datetime) -> Iterator[dict[str, Any]]:
+    ttl = timedelta(seconds=settings.session_ttl_seconds)
+    for i in range(sessions):
+        created_at = now - timedelta(seconds=rng.randrange(settings.session_ttl_seconds * 2))
+        yield {
+            "id": seed_id(_SESSION, i),
+            "user_id": seed_id(_USER, rng.randrange(users)),
+            "created_at": created_at,
+            "expires_at": created_at + ttl,
+            "revoked_at": created_at + ttl / 2 if rng.random() < 0.2 else None,
+        }
+
+
+def _lobby_rows(lobbies: int, users: int, now: datetime) -> Iterator[dict[str, Any]]:
+    gm_count = gm_count_for(users)
+    for j in range(lobbies):
+        yield {
+            "id": seed_id(_LOBBY, j),
+            "name": f"Lobby {j}",
+            "created_by_user_id": seed_id(_USER, j % gm_count),
+            "created_at": now,
+        }
+
+
+def _member_rows(
+    lobbies: int, users: int, members_per_lobby: int, rng: random.Random, now: datetime
+) -> Iterator[dict[str, Any]]:
+    gm_count = gm_count_for(users)
+    players = range(gm_count, users)
+    member_index = 0
+    for j in range(lobbies):
+        lobby_id = seed_id(_LOBBY, j)
+        picked = rng.sample(players, min(members_per_lobby, len(players)))
+        for user_index, is_dm in [(j % gm_count, True), *((p, False) for p in picked)]:
+            yield {
+                "id": seed_id(_MEMBER, member_index),
+                "lobby_id": lobby_id,
+                "user_id": seed_id(_USER, user_index),
+                "target_email": None,
+                "status": LobbyMemberStatus.ACTIVE,
+                "is_dm": is_dm,
+                "created_at": now,
+            }
+            member_index += 1
+        # One pending email invite per lobby, mirroring create_email_invite.
+        yield {
+            "id": seed_id(_MEMBER, member_index),
+            "lobby_id": lobby_id,
+            "user_id": None,
+            "target_email": f"invitee{j}@seed.example",
+            "status": LobbyMemberStatus.INVITED,
+            "is_dm": False,
+            "created_at": now,
+        }
+        member_index += 1
+
+
+def _invite_rows(lobbies: int, users: int, now: datetime) -> Iterator[dict[str, Any]]:
+    gm_count = gm_count_for(users)
+    for j in range(lobbies):
+        yield {
+            "id": seed_id(_INVITE, j),
+            "lobby_id": seed_id(_LOBBY, j),
+            "created_by_user_id": seed_id(_USER, j % gm_count),
+            "target_email": f"invitee{j}@seed.example",
+            "token_hash": uuid.UUID(int=j).hex + uuid.UUID(int=j).hex,
+            "expires_at": now + timedelta(days=7),
+            "used_at": None,
+            "created_at": now,
+        }
+
+
+def seed(
+    bind: Engine,
+    users: int,
+    sessions: int,
+    lobbies: int,
+    members_per_lobby: int = 5,
+    batch_size: int = 10_000,
+    rng_seed: int = 0,
+) -> dict[str, int]:
+    """Inserts the synthetic rows in batches; returns how many rows went into each table."""
+    rng = random.Random(rng_seed)
+    now = datetime.utcnow()
+    Base.metadata.create_all(bind=bind)
+
+    plan = [
+        (User, _user_rows(users, now)),
+        (DbSession, _session_rows(sessions, users, rng, now)),
+        (Lobby, _lobby_rows(lobbies, users, now)),
+        (LobbyMember, _member_rows(lobbies, users, members_per_lobby, rng, now)),
+        (Invite, _invite_rows(lobbies, users, now)),
+    ]
+    counts: dict[str, int] = {}
+    with Session(bind) as db:
+        for model, rows in plan:
+            inserted = 0
+            for batch in _batched(rows, batch_size):
+                db.execute(insert(model), batch)
+                db.commit()
+                inserted += len(batch)
+            logger.info("%s: %d rows", model.__tablename__, inserted)
+            counts[model.__tablename__] = inserted
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Seed the database with large synthetic volumes.")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--sessions", type=int, default=5_000_000)
+    parser.add_argument("--lobbies", type=int, default=200_000)
+    parser.add_argument("--members-per-lobby", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.users < 2 and args.lobbies:
+        parser.error("lobbies need at least one GM and one player")
+
+    seed(
+        engine,
+        users=args.users,
+        sessions=args.sessions,
+        lobbies=args.lobbies,
+        members_per_lobby=args.members_per_lobby,
+        batch_size=args.batch_size,
+        rng_seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    main()
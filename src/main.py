@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+import asyncio
+
 import uvicorn
 from fastapi import FastAPI
 
-from app.db import Base, engine
+from app.config import settings
+from app.db import Base, SessionLocal, engine
+from app.outbox import OutboxWorker, purge_finished_outbox
+from app.profiling import ProfilingMiddleware
 from app.routers.auth import router as auth_router
+from app.routers.invites import router as invites_router
 from app.routers.lobbies import router as lobbies_router
 
 
@@ -14,9 +20,29 @@ def create_app() -> FastAPI:
     @app.on_event("startup")
     def _startup() -> None:
         Base.metadata.create_all(bind=engine)
+        # Also runs without the worker, so queued invite tokens never outlive their invite.
+        with SessionLocal() as db:
+            purge_finished_outbox(db, settings.outbox_retention_seconds, settings.invite_ttl_seconds)
+
+    if settings.outbox_worker_enabled:
+        outbox_stop = asyncio.Event()
+        outbox_tasks: list[asyncio.Task[None]] = []
+
+        @app.on_event("startup")
+        async def _start_outbox_worker() -> None:
+            outbox_tasks.append(asyncio.create_task(OutboxWorker(SessionLocal).run(outbox_stop)))
+
+        @app.on_event("shutdown")
+        async def _stop_outbox_worker() -> None:
+            outbox_stop.set()
+            await asyncio.gather(*outbox_tasks)
 
     app.include_router(auth_router)
     app.include_router(lobbies_router)
+    app.include_router(invites_router)
+
+    if settings.profiling_enabled:
+        app.add_middleware(ProfilingMiddleware)
     return app
 
 
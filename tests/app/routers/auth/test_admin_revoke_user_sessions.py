@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import AccountType, User
+from app.models import Session as DbSession
+from app.security import ADMIN_TOKEN_HEADER
+
+ADMIN_TOKEN = "admin-secret"
+
+
+@pytest.fixture
+def victim(db: Session) -> User:
+    user = User(email="victim@test.com", password_hash="x", display_name="Victim", account_type=AccountType.PLAYER)
+    db.add(user)
+    db.flush()
+    db.add_all([DbSession(user_id=user.id, expires_at=datetime.utcnow() + timedelta(days=1)) for _ in range(3)])
+    db.commit()
+    return user
+
+
+def _live_sessions(db: Session, user: User) -> int:
+    db.expire_all()
+    stmt = select(DbSession.id).where(DbSession.user_id == user.id, DbSession.revoked_at.is_(None))
+    return len(db.execute(stmt).all())
+
+
+def test_happy_path_admin_revokes_user_sessions(client: TestClient, db: Session, victim: User) -> None:
+    """TST-001: happy path - a valid admin token revokes every live session of the user."""
+    with patch("app.security.settings.admin_token", ADMIN_TOKEN):
+        response = client.post(
+            f"/api/admin/users/{victim.id}/sessions/revoke", headers={ADMIN_TOKEN_HEADER: ADMIN_TOKEN}
+        )
+
+    assert response.status_code == 200
+    assert response.json() == {"revoked_sessions": 3}
+    assert _live_sessions(db, victim) == 0
+
+
+@pytest.mark.parametrize("headers", [{}, {ADMIN_TOKEN_HEADER: "guess"}, {ADMIN_TOKEN_HEADER: ""}])
+def test_missing_or_wrong_admin_token_is_forbidden(
+    client: TestClient, db: Session, victim: User, headers: dict[str, str]
+) -> None:
+    """TST-002: a missing, wrong or empty admin token fails with 403 and revokes nothing."""
+    with patch("app.security.settings.admin_token", ADMIN_TOKEN):
+        response = client.post(f"/api/admin/users/{victim.id}/sessions/revoke", headers=headers)
+
+    assert response.status_code == 403
+    assert _live_sessions(db, victim) == 3
+
+
+@pytest.mark.parametrize("configured", [None, ""])
+def test_admin_api_disabled_without_configured_token(
+    client: TestClient, db: Session, victim: User, configured: str | None
+) -> None:
+    """TST-003: with no admin token configured, no header value is accepted."""
+    with patch("app.security.settings.admin_token", configured):
+        for token in ("", "None", ADMIN_TOKEN):
+            response = client.post(f"/api/admin/users/{victim.id}/sessions/revoke", headers={ADMIN_TOKEN_HEADER: token})
+            assert response.status_code == 403
+    assert _live_sessions(db, victim) == 3
+
+
+def test_unknown_user_is_not_found(client: TestClient) -> None:
+    """TST-004: revoking sessions of a user that does not exist fails with 404."""
+    with patch("app.security.settings.admin_token", ADMIN_TOKEN):
+        response = client.post("/api/admin/users/missing/sessions/revoke", headers={ADMIN_TOKEN_HEADER: ADMIN_TOKEN})
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "User not found"
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import AccountType, User
+from app.models import Session as DbSession
+
+
+def _user(db: Session, email: str) -> User:
+    user = User(email=email, password_hash="x", display_name=email, account_type=AccountType.PLAYER)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_happy_path_all_sessions_revoked_and_cookie_deleted(client: TestClient, db: Session, login) -> None:
+    """TST-001: happy path - every live session of the caller is revoked and the cookie removed."""
+    user = _user(db, "player@test.com")
+    other_device = DbSession(user_id=user.id, expires_at=datetime.utcnow() + timedelta(days=1))
+    db.add(other_device)
+    db.commit()
+    login(user)
+
+    response = client.post("/api/logout/all")
+
+    assert response.status_code == 200
+    assert response.json() == {"revoked_sessions": 2}
+    assert f'{settings.session_cookie_name}=""' in response.headers["set-cookie"]
+    assert "Max-Age=0" in response.headers["set-cookie"]
+    db.expire_all()
+    assert all(db.execute(select(DbSession.revoked_at).where(DbSession.user_id == user.id)).scalars())
+
+
+def test_other_users_sessions_are_kept(client: TestClient, db: Session, login) -> None:
+    """TST-002: another user's sessions stay valid."""
+    user = _user(db, "player@test.com")
+    bystander = _user(db, "bystander@test.com")
+    bystander_session = login(bystander)
+    login(user)
+
+    assert client.post("/api/logout/all").json() == {"revoked_sessions": 1}
+
+    client.cookies.set(settings.session_cookie_name, bystander_session)
+    assert client.get("/api/whoami").status_code == 200
+
+
+def test_unauthenticated_or_revoked_caller_gets_401(client: TestClient, db: Session, login) -> None:
+    """TST-003: without a live session the endpoint fails with 401 and revokes nothing."""
+    assert client.post("/api/logout/all").status_code == 401
+
+    user = _user(db, "player@test.com")
+    session_id = login(user)
+    assert client.post("/api/logout/all").status_code == 200
+
+    client.cookies.set(settings.session_cookie_name, session_id)
+    assert client.post("/api/logout/all").status_code == 401
@@ -0,0 +1,118 @@
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.models import AccountType, Invite, Lobby, LobbyMember, LobbyMemberStatus, User
+from app.schemas import InviteAcceptRequest
+
+RAW_TOKEN = "raw-invite-token"
+TARGET_EMAIL = "player@test.com"
+
+
+@pytest.fixture(autouse=True)
+def _pending_invite(session_factory: sessionmaker[Session]) -> None:
+    with session_factory() as db:
+        gm = User(email="gm@test.com", password_hash="x", display_name="GM", account_type=AccountType.GM)
+        db.add(gm)
+        db.flush()
+        lobby = Lobby(name="Table", created_by_user_id=gm.id)
+        db.add(lobby)
+        db.flush()
+        db.add_all(
+            [
+                LobbyMember(lobby_id=lobby.id, user_id=gm.id, status=LobbyMemberStatus.ACTIVE, is_dm=True),
+                LobbyMember(lobby_id=lobby.id, target_email=TARGET_EMAIL, status=LobbyMemberStatus.INVITED),
+                Invite(
+                    lobby_id=lobby.id,
+                    created_by_user_id=gm.id,
+                    target_email=TARGET_EMAIL,
+                    token_hash=hashlib.sha256(RAW_TOKEN.encode("utf-8")).hexdigest(),
+                    expires_at=datetime.utcnow() + timedelta(days=7),
+                ),
+            ]
+        )
+        db.commit()
+
+
+def _payload() -> InviteAcceptRequest:
+    return InviteAcceptRequest(email=TARGET_EMAIL, password="SecurePass123!", display_name="Player")
+
+
+def test_happy_path_invite_accepted_and_member_promoted(session_factory) -> None:
+    """TST-001: happy path - invite consumed and membership promoted."""
+    from app.routers.invites import accept_email_invite
+
+    with patch("app.routers.invites.hash_password", return_value="hashed"), session_factory() as db:
+        result = accept_email_invite(_payload(), MagicMock(), RAW_TOKEN, db)
+
+    assert result.email == TARGET_EMAIL
+    assert result.account_type == AccountType.PLAYER
+
+    with session_factory() as db:
+        invite = db.execute(select(Invite)).scalars().one()
+        member = db.execute(select(LobbyMember).where(LobbyMember.target_email == TARGET_EMAIL)).scalars().one()
+        assert invite.used_at is not None
+        assert member.status == LobbyMemberStatus.ACTIVE
+        assert member.user_id == result.user_id
+
+
+def test_rejects_used_expired_or_mismatched_invite(session_factory) -> None:
+    """TST-002: invalid invites fail cleanly without partial state."""
+    from app.routers.invites import accept_email_invite
+
+    with session_factory() as db:
+        db.execute(select(Invite)).scalars().one().expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db.commit()
+
+    other_email = InviteAcceptRequest(email="other@test.com", password="SecurePass123!", display_name="Other")
+    with patch("app.routers.invites.hash_password", return_value="hashed"):
+        for payload, token in [(_payload(), RAW_TOKEN), (_payload(), "wrong-token"), (other_email, RAW_TOKEN)]:
+            with session_factory() as db, pytest.raises(HTTPException) as exc_info:
+                accept_email_invite(payload, MagicMock(), token, db)
+            assert exc_info.value.status_code == 404
+
+    with session_factory() as db:
+        assert db.execute(select(User).where(User.account_type == AccountType.PLAYER)).first() is None
+        assert db.execute(select(Invite)).scalars().one().used_at is None
+
+
+def test_concurrent_accepts_consume_token_once(session_factory) -> None:
+    """TST-003: concurrent accepts of one token - exactly one wins."""
+    from app.routers.invites import accept_email_invite
+
+    workers = 16
+    barrier = threading.Barrier(workers)
+    outcomes: list[int] = []
+    lock = threading.Lock()
+
+    def attempt() -> None:
+        barrier.wait()
+        with session_factory() as db:
+            try:
+                accept_email_invite(_payload(), MagicMock(), RAW_TOKEN, db)
+                status = 201
+            except HTTPException as e:
+                status = e.status_code
+        with lock:
+            outcomes.append(status)
+
+    with patch("app.routers.invites.hash_password", return_value="hashed"):
+        threads = [threading.Thread(target=attempt) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert sorted(outcomes) == [201] + [404] * (workers - 1)
+    with session_factory() as db:
+        players = db.execute(select(User).where(User.account_type == AccountType.PLAYER)).scalars().all()
+        member = db.execute(select(LobbyMember).where(LobbyMember.target_email == TARGET_EMAIL)).scalars().one()
+        assert len(players) == 1
+        assert member.status == LobbyMemberStatus.ACTIVE
+        assert member.user_id == players[0].id
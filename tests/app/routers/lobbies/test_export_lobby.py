@@ -0,0 +1,64 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.export import encode_export_cursor
+from app.models import AccountType, Lobby, LobbyMember, LobbyMemberStatus, User
+
+
+@pytest.fixture
+def table(db: Session) -> tuple[Lobby, User, User]:
+    gm = User(email="gm@test.com", password_hash="x", display_name="GM", account_type=AccountType.GM)
+    player = User(email="player@test.com", password_hash="x", display_name="P", account_type=AccountType.PLAYER)
+    db.add_all([gm, player])
+    db.flush()
+    lobby = Lobby(name="Table", created_by_user_id=gm.id)
+    db.add(lobby)
+    db.flush()
+    db.add_all(
+        [
+            LobbyMember(lobby_id=lobby.id, user_id=gm.id, status=LobbyMemberStatus.ACTIVE, is_dm=True),
+            LobbyMember(lobby_id=lobby.id, user_id=player.id, status=LobbyMemberStatus.ACTIVE, is_dm=False),
+        ]
+    )
+    db.commit()
+    return lobby, gm, player
+
+
+def test_dm_receives_ndjson_export(client: TestClient, login, table: tuple[Lobby, User, User]) -> None:
+    """TST-001: happy path - the DM streams the lobby as NDJSON."""
+    lobby, gm, _ = table
+    login(gm)
+
+    response = client.get(f"/api/lobbies/{lobby.id}/export")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert records[0]["type"] == "lobby"
+    assert records[0]["data"]["id"] == lobby.id
+    assert [r["type"] for r in records].count("lobby_members") == 2
+    assert records[-1] == {"type": "end"}
+
+
+def test_non_dm_and_unknown_lobby_are_rejected(client: TestClient, login, table: tuple[Lobby, User, User]) -> None:
+    """TST-002: players get 403, unknown lobbies 404, anonymous callers 401."""
+    lobby, _, player = table
+
+    assert client.get(f"/api/lobbies/{lobby.id}/export").status_code == 401
+    login(player)
+    assert client.get(f"/api/lobbies/{lobby.id}/export").status_code == 403
+    assert client.get("/api/lobbies/missing/export").status_code == 404
+
+
+def test_invalid_cursor_is_a_bad_request(client: TestClient, login, table: tuple[Lobby, User, User]) -> None:
+    """TST-003: a malformed or unknown-section cursor fails with 400 before streaming."""
+    lobby, gm, _ = table
+    login(gm)
+
+    for cursor in ("not-base64!", encode_export_cursor("chat_messages", "abc")):
+        response = client.get(f"/api/lobbies/{lobby.id}/export", params={"cursor": cursor})
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid export cursor"
@@ -0,0 +1,118 @@
+import asyncio
+import contextlib
+import threading
+
+from app.events import LobbyEventBroadcaster
+from app.models import LobbyMemberStatus
+from app.schemas import LobbyEvent, LobbyMemberResponse
+
+
+def _event(lobby_id: str, email: str) -> LobbyEvent:
+    return LobbyEvent(
+        type="member_invited",
+        lobby_id=lobby_id,
+        member=LobbyMemberResponse(user_id=None, target_email=email, status=LobbyMemberStatus.INVITED, is_dm=False),
+    )
+
+
+def test_stream_delivers_events_published_from_worker_threads() -> None:
+    """Events published from a threadpool thread reach subscribers of that lobby only."""
+    broadcaster = LobbyEventBroadcaster(buffer_size=10)
+
+    async def scenario() -> list[str]:
+        stream = broadcaster.stream("lobby-1", heartbeat_seconds=5)
+        first = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)  # let the stream subscribe
+
+        def publish() -> None:
+            broadcaster.publish(_event("lobby-2", "other@test.com"))
+            broadcaster.publish(_event("lobby-1", "player@test.com"))
+
+        threading.Thread(target=publish).start()
+        chunks = [await asyncio.wait_for(first, timeout=1)]
+        await stream.aclose()
+        return chunks
+
+    chunks = asyncio.run(scenario())
+
+    assert len(chunks) == 1
+    assert chunks[0].startswith("event: member_invited\ndata: ")
+    assert "player@test.com" in chunks[0]
+    assert broadcaster._subscriptions == {}
+
+
+def test_stream_sends_heartbeats_when_idle() -> None:
+    """Idle streams emit SSE comment heartbeats."""
+    broadcaster = LobbyEventBroadcaster(buffer_size=10)
+
+    async def scenario() -> str:
+        stream = broadcaster.stream("lobby-1", heartbeat_seconds=0.01)
+        chunk = await anext(stream)
+        await stream.aclose()
+        return chunk
+
+    assert asyncio.run(scenario()) == ": heartbeat\n\n"
+
+
+def test_slow_client_is_disconnected_when_buffer_overflows() -> None:
+    """A subscriber that exceeds its buffer gets its stream closed."""
+    broadcaster = LobbyEventBroadcaster(buffer_size=2)
+
+    async def scenario() -> bool:
+        stream = broadcaster.stream("lobby-1", heartbeat_seconds=5)
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        subscription = next(iter(broadcaster._subscriptions["lobby-1"]))
+        for i in range(3):
+            subscription.deliver(_event("lobby-1", f"p{i}@test.com"))
+        try:
+            await asyncio.wait_for(pending, timeout=1)
+        except StopAsyncIteration:
+            return True
+        return False
+
+    assert asyncio.run(scenario())
+    assert broadcaster._subscriptions == {}
+
+
+def test_close_streams_ends_only_matching_subscriptions() -> None:
+    """Revoking a user's sessions closes that user's streams and leaves others open."""
+    broadcaster = LobbyEventBroadcaster(buffer_size=10)
+
+    async def scenario() -> tuple[bool, bool]:
+        victim = broadcaster.stream("lobby-1", heartbeat_seconds=5, user_id="victim", session_id="s1")
+        bystander = broadcaster.stream("lobby-1", heartbeat_seconds=5, user_id="bystander", session_id="s2")
+        victim_next = asyncio.ensure_future(anext(victim))
+        bystander_next = asyncio.ensure_future(anext(bystander))
+        await asyncio.sleep(0)
+
+        threading.Thread(target=lambda: broadcaster.close_streams(user_id="victim")).start()
+        try:
+            await asyncio.wait_for(victim_next, timeout=1)
+            victim_closed = False
+        except StopAsyncIteration:
+            victim_closed = True
+        await asyncio.sleep(0.01)
+        bystander_open = not bystander_next.done()
+        bystander_next.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await bystander_next
+        return victim_closed, bystander_open
+
+    assert asyncio.run(scenario()) == (True, True)
+
+
+def test_stream_ends_when_reauthorization_fails() -> None:
+    """The heartbeat re-check ends streams whose session or membership is gone."""
+    broadcaster = LobbyEventBroadcaster(buffer_size=10)
+    checks = iter([True, False])
+
+    async def authorize() -> bool:
+        return next(checks)
+
+    async def scenario() -> list[str]:
+        stream = broadcaster.stream("lobby-1", heartbeat_seconds=0.01, authorize=authorize)
+        return [chunk async for chunk in stream]
+
+    assert asyncio.run(scenario()) == [": heartbeat\n\n"]
+    assert broadcaster._subscriptions == {}
@@ -0,0 +1,71 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.export import InvalidExportCursor, decode_export_cursor, encode_export_cursor, iter_lobby_export
+from app.models import AccountType, Invite, Lobby, LobbyMember, LobbyMemberStatus, User
+
+
+@pytest.fixture
+def lobby(db: Session) -> Lobby:
+    gm = User(email="gm@test.com", password_hash="x", display_name="GM", account_type=AccountType.GM)
+    db.add(gm)
+    db.flush()
+    lobby = Lobby(name="Table", created_by_user_id=gm.id)
+    db.add(lobby)
+    db.flush()
+    db.add(LobbyMember(lobby_id=lobby.id, user_id=gm.id, status=LobbyMemberStatus.ACTIVE, is_dm=True))
+    for i in range(24):
+        email = f"player{i}@test.com"
+        db.add(LobbyMember(lobby_id=lobby.id, target_email=email, status=LobbyMemberStatus.INVITED))
+        db.add(
+            Invite(
+                lobby_id=lobby.id,
+                created_by_user_id=gm.id,
+                target_email=email,
+                token_hash=f"{i:064d}",
+                expires_at=datetime.utcnow() + timedelta(days=7),
+            )
+        )
+    db.commit()
+    return lobby
+
+
+def _records(chunks) -> list[dict]:
+    return [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+
+
+def test_full_export_streams_all_sections_in_batches(db: Session, lobby: Lobby) -> None:
+    """A fresh export emits the lobby, every member and invite, then an end marker."""
+    chunks = list(iter_lobby_export(db, lobby, batch_size=10))
+    records = _records(chunks)
+
+    assert records[0]["type"] == "lobby"
+    assert records[0]["data"]["name"] == "Table"
+    assert [r["type"] for r in records[1:]].count("lobby_members") == 25
+    assert [r["type"] for r in records[1:]].count("invites") == 24
+    assert records[-1] == {"type": "end"}
+    assert "token_hash" not in json.dumps(records)
+    # Batched: one chunk per fetched partition, not one per row.
+    assert len(chunks) < len(records) / 5
+
+
+def test_resume_from_cursor_continues_after_last_record(db: Session, lobby: Lobby) -> None:
+    """Resuming from any record's cursor yields exactly the remaining records."""
+    full = _records(iter_lobby_export(db, lobby, batch_size=7))
+    rows = [r for r in full if "cursor" in r]
+
+    for cut in (0, 12, 24, 30, len(rows) - 1):
+        resumed = _records(iter_lobby_export(db, lobby, cursor=rows[cut]["cursor"], batch_size=7))
+        assert resumed[-1] == {"type": "end"}
+        assert [r["data"]["id"] for r in resumed[:-1]] == [r["data"]["id"] for r in rows[cut + 1 :]]
+
+
+def test_invalid_cursor_is_rejected() -> None:
+    """Malformed or unknown-section cursors raise InvalidExportCursor."""
+    assert decode_export_cursor(encode_export_cursor("invites", "abc")) == (1, "abc")
+    for cursor in ("not-base64!", encode_export_cursor("chat_messages", "abc"), "W10"):
+        with pytest.raises(InvalidExportCursor):
+            decode_export_cursor(cursor)
@@ -0,0 +1,117 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import HTTPException
+
+from app.idempotency import IdempotencyStore
+
+
+def test_replay_skips_business_logic() -> None:
+    """The first response is stored and replayed for the same user and key."""
+    store = IdempotencyStore(maxsize=10, ttl_seconds=60, wait_seconds=5)
+    operation = MagicMock(return_value="lobby-1")
+
+    first = store.run("user-1", "create_lobby", "key-1", "{}", str, operation)
+    replay = store.run("user-1", "create_lobby", "key-1", "{}", str, operation)
+    other_user = store.run("user-2", "create_lobby", "key-1", "{}", str, operation)
+
+    assert first == replay == other_user == "lobby-1"
+    assert operation.call_count == 2
+
+
+def test_requests_without_key_always_execute() -> None:
+    """No Idempotency-Key means no deduplication."""
+    store = IdempotencyStore(maxsize=10, ttl_seconds=60, wait_seconds=5)
+    operation = MagicMock(return_value="ok")
+
+    store.run("user-1", "create_lobby", None, "{}", str, operation)
+    store.run("user-1", "create_lobby", None, "{}", str, operation)
+
+    assert operation.call_count == 2
+
+
+def test_key_reused_with_different_payload_is_rejected() -> None:
+    """Reusing a key for a different request body fails with 422."""
+    store = IdempotencyStore(maxsize=10, ttl_seconds=60, wait_seconds=5)
+    store.run("user-1", "create_lobby", "key-1", '{"name":"a"}', str, lambda: "lobby-1")
+
+    with pytest.raises(HTTPException) as exc_info:
+        store.run("user-1", "create_lobby", "key-1", '{"name":"b"}', str, lambda: "lobby-2")
+    assert exc_info.value.status_code == 422
+
+
+def test_client_errors_are_replayed_server_errors_are_not() -> None:
+    """4xx outcomes are stored, 5xx outcomes let the retry run."""
+    store = IdempotencyStore(maxsize=10, ttl_seconds=60, wait_seconds=5)
+    forbidden = MagicMock(side_effect=HTTPException(status_code=403, detail="Only GMs can create lobbies"))
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc_info:
+            store.run("user-1", "create_lobby", "key-1", "{}", str, forbidden)
+        assert exc_info.value.status_code == 403
+    assert forbidden.call_count == 1
+
+    broken = MagicMock(side_effect=[HTTPException(status_code=500, detail="boom"), "lobby-1"])
+    with pytest.raises(HTTPException):
+        store.run("user-1", "create_lobby", "key-2", "{}", str, broken)
+    assert store.run("user-1", "create_lobby", "key-2", "{}", str, broken) == "lobby-1"
+
+
+def test_concurrent_duplicates_collapse_into_one_execution() -> None:
+    """Concurrent requests with one key run the operation once and share its result."""
+    store = IdempotencyStore(maxsize=10, ttl_seconds=60, wait_seconds=5)
+    calls = 0
+    calls_lock = threading.Lock()
+
+    def slow_create() -> str:
+        nonlocal calls
+        with calls_lock:
+            calls += 1
+        time.sleep(0.05)
+        return "lobby-1"
+
+    workers = 8
+    barrier = threading.Barrier(workers)
+    results: list[str] = []
+
+    def attempt() -> None:
+        barrier.wait()
+        result = store.run("user-1", "create_lobby", "key-1", "{}", str, slow_create)
+        with calls_lock:
+            results.append(result)
+
+    threads = [threading.Thread(target=attempt) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == 1
+    assert results == ["lobby-1"] * workers
+
+
+def test_duplicate_gets_409_after_bounded_wait_and_releases_connection() -> None:
+    """A duplicate waits at most wait_seconds, releasing its DB connection first."""
+    store = IdempotencyStore(maxsize=10, ttl_seconds=60, wait_seconds=0.05)
+    started = threading.Event()
+    finish = threading.Event()
+
+    def slow_create() -> str:
+        started.set()
+        finish.wait(timeout=5)
+        return "lobby-1"
+
+    owner = threading.Thread(target=lambda: store.run("user-1", "create_lobby", "key-1", "{}", str, slow_create))
+    owner.start()
+    started.wait(timeout=5)
+
+    release_connection = MagicMock()
+    with pytest.raises(HTTPException) as exc_info:
+        store.run("user-1", "create_lobby", "key-1", "{}", str, slow_create, before_wait=release_connection)
+    assert exc_info.value.status_code == 409
+    release_connection.assert_called_once()
+
+    finish.set()
+    owner.join()
+    assert store.run("user-1", "create_lobby", "key-1", "{}", str, slow_create) == "lobby-1"
@@ -0,0 +1,101 @@
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.cache import TTLCache
+from app.deps import get_lobby_role, require_lobby_dm
+from app.membership import get_lobby_roles, invalidate_lobby_roles, lobby_role_cache
+from app.models import LobbyRole, User
+
+
+@pytest.fixture(autouse=True)
+def _clear_role_cache():
+    lobby_role_cache.clear()
+    yield
+    lobby_role_cache.clear()
+
+
+def _mock_db(rows: list[tuple[str, bool]]) -> MagicMock:
+    mock_db = MagicMock(spec=Session)
+    mock_db.execute.return_value.all.return_value = rows
+    return mock_db
+
+
+def test_ttl_cache_expires_and_evicts_least_recently_used() -> None:
+    """TTLCache honours both TTL and maxsize."""
+    now = [0.0]
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl_seconds=10, clock=lambda: now[0])
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)  # evicts "b", "a" was used more recently
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+    now[0] = 10.0
+    assert cache.get("a") is None
+    assert cache.get("c") is None
+
+
+def test_roles_loaded_once_and_served_from_cache() -> None:
+    """All lobby roles of a user come from a single query."""
+    mock_db = _mock_db([("lobby-1", True), ("lobby-2", False)])
+
+    assert get_lobby_roles(mock_db, "user-1") == {"lobby-1": LobbyRole.DM, "lobby-2": LobbyRole.PLAYER}
+    assert get_lobby_roles(mock_db, "user-1")["lobby-2"] == LobbyRole.PLAYER
+    mock_db.execute.assert_called_once()
+
+    invalidate_lobby_roles("user-1", None)
+    get_lobby_roles(mock_db, "user-1")
+    assert mock_db.execute.call_count == 2
+
+
+def test_lobby_role_dependencies_authorize_from_cache() -> None:
+    """Membership and DM checks issue no query on a cache hit."""
+    mock_db = MagicMock(spec=Session)
+    mock_user = MagicMock(spec=User)
+    mock_user.id = "user-1"
+    lobby_role_cache.set("user-1", {"lobby-dm": LobbyRole.DM, "lobby-player": LobbyRole.PLAYER})
+
+    assert get_lobby_role("lobby-dm", mock_db, mock_user) == LobbyRole.DM
+    assert require_lobby_dm(get_lobby_role("lobby-dm", mock_db, mock_user)) == LobbyRole.DM
+    with pytest.raises(HTTPException) as exc_info:
+        require_lobby_dm(get_lobby_role("lobby-player", mock_db, mock_user))
+    assert exc_info.value.status_code == 403
+    mock_db.execute.assert_not_called()
+    mock_db.get.assert_not_called()
+
+    mock_db.get.return_value = None
+    with pytest.raises(HTTPException) as exc_info:
+        get_lobby_role("missing", mock_db, mock_user)
+    assert exc_info.value.status_code == 404
+
+    mock_db.get.return_value = object()
+    with pytest.raises(HTTPException) as exc_info:
+        get_lobby_role("someone-elses", mock_db, mock_user)
+    assert exc_info.value.status_code == 403
+
+
+def test_invalidation_during_load_is_not_overwritten() -> None:
+    """Roles loaded before a concurrent invalidation are returned but not cached."""
+    stale = MagicMock()
+    stale.all.return_value = [("lobby-1", True)]
+    fresh = MagicMock()
+    fresh.all.return_value = []
+    mock_db = MagicMock(spec=Session)
+
+    def execute_then_invalidate(stmt):
+        # A re-invite commits and invalidates between this SELECT and the cache write.
+        invalidate_lobby_roles("user-1")
+        return stale
+
+    mock_db.execute.side_effect = execute_then_invalidate
+    assert get_lobby_roles(mock_db, "user-1") == {"lobby-1": LobbyRole.DM}
+    assert lobby_role_cache.get("user-1") is None
+
+    mock_db.execute.side_effect = None
+    mock_db.execute.return_value = fresh
+    assert get_lobby_roles(mock_db, "user-1") == {}
+    assert lobby_role_cache.get("user-1") == {}
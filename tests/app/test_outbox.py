@@ -0,0 +1,276 @@
+import asyncio
+import smtplib
+import socketserver
+import threading
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from functools import partial
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import select, update
+
+from app.models import AccountType, Lobby, LobbyRole, OutboxMessage, OutboxStatus, User
+from app.outbox import (
+    OutboxWorker,
+    SmtpPool,
+    claim_outbox_batch,
+    enqueue_invite_email,
+    purge_finished_outbox,
+    record_outbox_result,
+)
+from app.routers.lobbies import create_email_invite
+from app.schemas import EmailInviteCreateRequest
+
+REJECTED_DOMAIN = "@rejected.test"
+
+
+class _SmtpStandIn(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: records delivered recipients, refuses REJECTED_DOMAIN."""
+
+    def handle(self) -> None:
+        self.server.connections += 1
+        self._reply("220 stand-in ready")
+        recipients: list[str] = []
+        while line := self.rfile.readline():
+            command = line.decode("ascii").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self._reply("250 stand-in")
+            elif verb == "MAIL":
+                recipients = []
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                address = command.split(":", 1)[1].strip("<> ")
+                if address.endswith(REJECTED_DOMAIN):
+                    self._reply("550 mailbox unavailable")
+                else:
+                    recipients.append(address)
+                    self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 go ahead")
+                while self.rfile.readline().rstrip(b"\r\n") != b".":
+                    pass
+                with self.server.lock:
+                    self.server.delivered.extend(recipients)
+                self._reply("250 queued")
+            elif verb == "QUIT":
+                self._reply("221 bye")
+                return
+            else:
+                self._reply("250 OK")
+
+    def _reply(self, text: str) -> None:
+        self.wfile.write(f"{text}\r\n".encode("ascii"))
+
+
+@pytest.fixture
+def smtp_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SmtpStandIn)
+    server.daemon_threads = True
+    server.delivered = []
+    server.connections = 0
+    server.lock = threading.Lock()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _enqueue(session_factory, recipients: list[str]) -> None:
+    with session_factory() as db:
+        for recipient in recipients:
+            enqueue_invite_email(db, recipient, f"http://testserver/api/invites/accept?token={recipient}")
+        db.commit()
+
+
+def _worker(session_factory, smtp_server, concurrency: int = 3) -> OutboxWorker:
+    host, port = smtp_server.server_address
+    pool = SmtpPool(concurrency, connect=partial(smtplib.SMTP, host, port, timeout=5))
+    return OutboxWorker(session_factory, pool)
+
+
+def test_worker_delivers_batch_over_pooled_connections(session_factory, smtp_server) -> None:
+    """A batch is delivered with at most `concurrency` SMTP connections."""
+    recipients = [f"player{i}@test.com" for i in range(12)]
+    _enqueue(session_factory, recipients)
+    worker = _worker(session_factory, smtp_server, concurrency=3)
+
+    async def scenario() -> int:
+        claimed = await worker.run_once()
+        worker.pool.close()
+        return claimed
+
+    assert asyncio.run(scenario()) == 12
+    assert sorted(smtp_server.delivered) == sorted(recipients)
+    assert smtp_server.connections <= 3
+    with session_factory() as db:
+        statuses = db.execute(select(OutboxMessage.status, OutboxMessage.sent_at)).all()
+        assert all(status == OutboxStatus.SENT and sent_at is not None for status, sent_at in statuses)
+
+
+def test_failed_delivery_is_retried_then_marked_failed(session_factory, smtp_server) -> None:
+    """Refused messages back off, then fail after max attempts."""
+    _enqueue(session_factory, [f"nobody{REJECTED_DOMAIN}"])
+    worker = _worker(session_factory, smtp_server)
+
+    async def attempt() -> int:
+        return await worker.run_once()
+
+    with patch("app.outbox.settings.outbox_max_attempts", 2):
+        assert asyncio.run(attempt()) == 1
+        with session_factory() as db:
+            message = db.execute(select(OutboxMessage)).scalars().one()
+            assert message.status == OutboxStatus.PENDING
+            assert message.attempts == 1
+            assert message.available_at > datetime.utcnow()
+            assert "550" in message.last_error
+            message.available_at = datetime.utcnow() - timedelta(seconds=1)
+            db.commit()
+
+        assert asyncio.run(attempt()) == 1
+    worker.pool.close()
+
+    with session_factory() as db:
+        message = db.execute(select(OutboxMessage)).scalars().one()
+        assert message.status == OutboxStatus.FAILED
+        assert message.attempts == 2
+    assert smtp_server.delivered == []
+
+
+def test_claimed_rows_are_leased_to_one_worker(session_factory) -> None:
+    """A claimed batch is not handed out again while its lease is live."""
+    _enqueue(session_factory, [f"player{i}@test.com" for i in range(5)])
+
+    with session_factory() as db:
+        first = claim_outbox_batch(db, batch_size=3, lease_seconds=60, max_attempts=5)
+    with session_factory() as db:
+        second = claim_outbox_batch(db, batch_size=10, lease_seconds=60, max_attempts=5)
+    with session_factory() as db:
+        third = claim_outbox_batch(db, batch_size=10, lease_seconds=60, max_attempts=5)
+
+    assert len(first) == 3
+    assert len(second) == 2
+    assert {m.id for m in first}.isdisjoint(m.id for m in second)
+    assert third == []
+
+
+def test_no_raw_token_left_after_delivery_or_failure(session_factory, smtp_server) -> None:
+    """Bodies carrying invite tokens are cleared once a message is sent or failed."""
+    _enqueue(session_factory, ["player@test.com", f"nobody{REJECTED_DOMAIN}"])
+    worker = _worker(session_factory, smtp_server)
+
+    with patch("app.outbox.settings.outbox_max_attempts", 1):
+        assert asyncio.run(worker.run_once()) == 2
+    worker.pool.close()
+
+    with session_factory() as db:
+        rows = db.execute(select(OutboxMessage.status, OutboxMessage.body)).all()
+    assert sorted(status for status, _ in rows) == [OutboxStatus.FAILED, OutboxStatus.SENT]
+    assert all(body is None for _, body in rows)
+    assert smtp_server.delivered == ["player@test.com"]
+
+
+def test_purge_removes_old_finished_and_expired_messages(session_factory) -> None:
+    """Finished messages past retention and any message past the invite TTL are deleted."""
+    now = datetime.utcnow()
+    with session_factory() as db:
+        for status, created_at in [
+            (OutboxStatus.SENT, now - timedelta(days=3)),
+            (OutboxStatus.FAILED, now - timedelta(days=3)),
+            (OutboxStatus.PENDING, now - timedelta(days=8)),
+            (OutboxStatus.PENDING, now - timedelta(days=3)),
+            (OutboxStatus.SENT, now),
+        ]:
+            db.add(OutboxMessage(recipient="p@test.com", subject="s", body=None, status=status, created_at=created_at))
+        db.commit()
+
+        assert purge_finished_outbox(db, older_than_seconds=60 * 60 * 24, expire_after_seconds=60 * 60 * 24 * 7) == 3
+        remaining = db.execute(select(OutboxMessage.status)).scalars().all()
+    assert sorted(remaining) == [OutboxStatus.PENDING, OutboxStatus.SENT]
+
+
+def test_pool_keeps_connection_after_recipient_refusal(session_factory, smtp_server) -> None:
+    """A refused recipient does not cost the pooled connection."""
+    _enqueue(session_factory, [f"nobody{REJECTED_DOMAIN}"])
+    _enqueue(session_factory, ["player@test.com"])
+    worker = _worker(session_factory, smtp_server, concurrency=1)
+
+    async def scenario() -> None:
+        await worker.run_once()
+        worker.pool.close()
+
+    asyncio.run(scenario())
+
+    assert smtp_server.delivered == ["player@test.com"]
+    assert smtp_server.connections == 1
+
+
+def test_pool_closes_dropped_connection_before_reconnecting() -> None:
+    """An idle connection the server dropped is closed, and the send retried on a new one."""
+    dead = MagicMock(spec=smtplib.SMTP)
+    dead.send_message.side_effect = smtplib.SMTPServerDisconnected()
+    fresh = MagicMock(spec=smtplib.SMTP)
+    pool = SmtpPool(1, connect=lambda: fresh)
+    pool._idle.append(dead)
+
+    asyncio.run(pool.send(EmailMessage()))
+
+    dead.close.assert_called_once()
+    fresh.send_message.assert_called_once()
+    assert pool._idle == [fresh]
+
+
+def test_lapsed_lease_does_not_overwrite_new_claim(session_factory) -> None:
+    """A worker whose lease lapsed cannot record over the claim that replaced it."""
+    _enqueue(session_factory, ["player@test.com"])
+    with session_factory() as db:
+        (stale,) = claim_outbox_batch(db, batch_size=1, lease_seconds=60, max_attempts=5)
+        db.execute(update(OutboxMessage).values(available_at=datetime.utcnow() - timedelta(seconds=1)))
+        db.commit()
+        (current,) = claim_outbox_batch(db, batch_size=1, lease_seconds=60, max_attempts=5)
+
+        assert not record_outbox_result(db, stale, "SMTPServerDisconnected()", max_attempts=1)
+        message = db.execute(select(OutboxMessage)).scalars().one()
+        assert (message.status, message.attempts, message.last_error) == (OutboxStatus.PENDING, 2, None)
+
+        assert record_outbox_result(db, current, None, max_attempts=5)
+        db.refresh(message)
+        assert message.status == OutboxStatus.SENT
+
+
+def test_exhausted_rows_are_not_claimed_again(session_factory) -> None:
+    """A row whose attempts ran out without a recorded result stays unclaimed."""
+    _enqueue(session_factory, ["player@test.com"])
+    with session_factory() as db:
+        db.execute(update(OutboxMessage).values(attempts=5))
+        db.commit()
+        assert claim_outbox_batch(db, batch_size=10, lease_seconds=60, max_attempts=5) == []
+
+
+def test_worker_refuses_lease_shorter_than_a_batch(session_factory) -> None:
+    """The worker does not start when a batch could outlive its lease."""
+    with patch("app.outbox.settings.outbox_lease_seconds", 60), pytest.raises(ValueError, match="lease"):
+        OutboxWorker(session_factory, SmtpPool(1))
+
+
+@pytest.mark.parametrize("worker_enabled", [False, True])
+def test_invite_email_queued_only_when_worker_runs(session_factory, worker_enabled: bool) -> None:
+    """With no worker to send and clear it, no raw invite token is written to the outbox."""
+    with session_factory() as db:
+        gm = User(email="gm@test.com", password_hash="x", display_name="GM", account_type=AccountType.GM)
+        db.add(gm)
+        db.flush()
+        lobby = Lobby(name="Table", created_by_user_id=gm.id)
+        db.add(lobby)
+        db.commit()
+        request = MagicMock()
+        request.base_url = "http://testserver/"
+        payload = EmailInviteCreateRequest(target_email="player@test.com")
+
+        with patch("app.routers.lobbies.settings.outbox_worker_enabled", worker_enabled):
+            create_email_invite(lobby.id, payload, request, db, gm, LobbyRole.DM, idempotency_key=None)
+
+        bodies = db.execute(select(OutboxMessage.body)).scalars().all()
+    assert len(bodies) == int(worker_enabled)
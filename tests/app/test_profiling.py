@@ -0,0 +1,150 @@
+import asyncio
+import os
+import time
+from unittest.mock import patch
+
+from app.profiling import ProfilingMiddleware, StackSampler, rotate_profiles
+
+TEST_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def _busy_endpoint_work(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+async def _endpoint(scope, receive, send) -> None:
+    await asyncio.to_thread(_busy_endpoint_work, 0.1)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def _call_async(
+    middleware: ProfilingMiddleware,
+    headers: list[tuple[bytes, bytes]],
+    path: str = "/api/lobbies/abc",
+    sent: list[dict] | None = None,
+) -> None:
+    sent = [] if sent is None else sent
+
+    async def receive() -> dict:
+        return {"type": "http.request", "body": b""}
+
+    async def send(message: dict) -> None:
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path, "headers": headers}
+    await middleware(scope, receive, send)
+    assert sent[0]["status"] == 200
+
+
+def _call(middleware: ProfilingMiddleware, headers: list[tuple[bytes, bytes]]) -> None:
+    asyncio.run(_call_async(middleware, headers))
+
+
+def _wait_for_profiles(directory, count: int) -> list:
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline:
+        profiles = sorted(directory.glob("*.folded"))
+        if len(profiles) >= count:
+            return profiles
+        time.sleep(0.01)
+    return sorted(directory.glob("*.folded"))
+
+
+def test_admin_header_request_writes_collapsed_stacks(tmp_path) -> None:
+    """An admin request asking for a profile is written to a folded-stack file."""
+    with patch("app.security.settings.admin_token", "secret"):
+        middleware = ProfilingMiddleware(_endpoint, sample_rate=0.0, output_dir=str(tmp_path), roots=(TEST_ROOT,))
+        _call(middleware, [(b"x-profile-request", b"1"), (b"x-admin-token", b"secret")])
+
+    profiles = _wait_for_profiles(tmp_path, 1)
+    assert len(profiles) == 1
+    assert "GET-api_lobbies_abc" in profiles[0].name
+    lines = profiles[0].read_text().splitlines()
+    assert any("_busy_endpoint_work" in line for line in lines)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert ";" in stack
+
+
+def test_unsampled_requests_are_not_profiled(tmp_path) -> None:
+    """A wrong admin token, no opt-in header and zero sample rate skip profiling."""
+    with patch("app.security.settings.admin_token", "secret"):
+        middleware = ProfilingMiddleware(_endpoint, sample_rate=0.0, output_dir=str(tmp_path), roots=(TEST_ROOT,))
+        _call(middleware, [(b"x-profile-request", b"1"), (b"x-admin-token", b"guess")])
+        _call(middleware, [(b"x-admin-token", b"secret")])
+
+    time.sleep(0.05)
+    assert list(tmp_path.glob("*.folded")) == []
+
+
+def test_rotation_keeps_newest_profiles(tmp_path) -> None:
+    """Rotation deletes the oldest profiles beyond the limit."""
+    for i in range(5):
+        path = tmp_path / f"{i}.folded"
+        path.write_text("a;b 1\n")
+        os.utime(path, (i, i))
+
+    rotate_profiles(tmp_path, max_files=2)
+
+    assert sorted(p.name for p in tmp_path.glob("*.folded")) == ["3.folded", "4.folded"]
+
+
+def test_only_one_sampler_runs_at_a_time(tmp_path) -> None:
+    """A second sampler is refused while one is active, and allowed once it finishes."""
+    first = StackSampler(tmp_path / "first.folded", 0.001, (TEST_ROOT,))
+    second = StackSampler(tmp_path / "second.folded", 0.001, (TEST_ROOT,))
+    assert first.try_start()
+    assert not second.try_start()
+    first.stop()
+    first.join(timeout=2)
+
+    assert second.try_start()
+    second.stop()
+    second.join(timeout=2)
+
+
+def test_sampler_stops_itself_after_max_seconds(tmp_path) -> None:
+    """A sampler that is never stopped ends at its deadline and frees the slot."""
+    sampler = StackSampler(tmp_path / "capped.folded", 0.001, (TEST_ROOT,), max_seconds=0.05)
+    assert sampler.try_start()
+    sampler.join(timeout=2)
+
+    follower = StackSampler(tmp_path / "follower.folded", 0.001, (TEST_ROOT,))
+    assert follower.try_start()
+    follower.stop()
+    follower.join(timeout=2)
+
+
+def test_long_lived_stream_does_not_block_other_profiles(tmp_path) -> None:
+    """An open event stream stops its profile at the headers, so a later request is profiled."""
+    release = asyncio.Event()
+
+    async def stream_endpoint(scope, receive, send) -> None:
+        headers = [(b"content-type", b"text/event-stream; charset=utf-8")]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await release.wait()
+        await send({"type": "http.response.body", "body": b""})
+
+    admin_headers = [(b"x-profile-request", b"1"), (b"x-admin-token", b"secret")]
+
+    async def scenario() -> None:
+        streaming = ProfilingMiddleware(stream_endpoint, sample_rate=0.0, output_dir=str(tmp_path), roots=(TEST_ROOT,))
+        regular = ProfilingMiddleware(_endpoint, sample_rate=0.0, output_dir=str(tmp_path), roots=(TEST_ROOT,))
+        stream_sent: list[dict] = []
+        stream = asyncio.create_task(_call_async(streaming, admin_headers, "/api/lobbies/abc/events", stream_sent))
+        while not stream_sent:
+            await asyncio.sleep(0.001)
+        await asyncio.sleep(0.05)  # let the stopped sampler thread release the slot
+
+        await _call_async(regular, admin_headers)
+        release.set()
+        await stream
+
+    with patch("app.security.settings.admin_token", "secret"):
+        asyncio.run(scenario())
+
+    profiles = _wait_for_profiles(tmp_path, 1)
+    assert [p.name for p in profiles if "GET-api_lobbies_abc-" in p.name]
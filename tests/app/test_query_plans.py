@@ -0,0 +1,128 @@
+"""EXPLAIN the statements behind the hot auth and lobby paths and fail when one stops using an index.
+
+By default a small SQLite database is seeded with `app.seed`. Point
+OTRPG_PLAN_TEST_DATABASE_URL at a database seeded at production volume
+(`python -m app.seed`) to check the plans a real planner picks; every
+statement runs inside a transaction that is rolled back.
+"""
+
+import os
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi import Response
+from sqlalchemy import Connection, Engine, create_engine, event
+from sqlalchemy.orm import Session
+
+from app.deps import get_lobby_role
+from app.membership import lobby_role_cache
+from app.models import User
+from app.routers.auth import login
+from app.routers.lobbies import create_email_invite, get_lobby_details
+from app.schemas import EmailInviteCreateRequest, LoginRequest
+from app.security import get_user_for_session, revoke_user_sessions
+from app.seed import _LOBBY, _SESSION, _USER, SEED_PASSWORD, seed, seed_email, seed_id
+
+PLAN_DATABASE_URL = os.environ.get("OTRPG_PLAN_TEST_DATABASE_URL")
+CHECKED_VERBS = ("SELECT", "UPDATE", "DELETE")
+
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory) -> Iterator[Engine]:
+    if PLAN_DATABASE_URL:
+        engine = create_engine(PLAN_DATABASE_URL)
+    else:
+        engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('plans') / 'plans.db'}")
+        seed(engine, users=200, sessions=1_000, lobbies=50, members_per_lobby=5)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def connection(engine: Engine) -> Iterator[Connection]:
+    with engine.connect() as conn:
+        outer = conn.begin()
+        yield conn
+        outer.rollback()
+
+
+@pytest.fixture
+def db(connection: Connection) -> Iterator[Session]:
+    lobby_role_cache.clear()
+    with Session(bind=connection, join_transaction_mode="create_savepoint") as session:
+        yield session
+    lobby_role_cache.clear()
+
+
+@contextmanager
+def captured_statements(connection: Connection) -> Iterator[list[tuple[str, Any]]]:
+    statements: list[tuple[str, Any]] = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany) -> None:
+        if statement.lstrip().upper().startswith(CHECKED_VERBS):
+            statements.append((statement, parameters))
+
+    event.listen(connection, "before_cursor_execute", _capture)
+    try:
+        yield statements
+    finally:
+        event.remove(connection, "before_cursor_execute", _capture)
+
+
+def unindexed_steps(connection: Connection, statement: str, parameters: Any) -> list[str]:
+    if connection.dialect.name == "sqlite":
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        return [row[3] for row in rows if row[3].startswith("SCAN ")]
+    rows = connection.exec_driver_sql(f"EXPLAIN {statement}", parameters).all()
+    return [row[0] for row in rows if "Seq Scan" in row[0]]
+
+
+def assert_all_indexed(connection: Connection, statements: list[tuple[str, Any]]) -> None:
+    assert statements, "no statements captured"
+    for statement, parameters in statements:
+        steps = unindexed_steps(connection, statement, parameters)
+        assert not steps, f"unindexed plan {steps} for:\n{statement}"
+
+
+def test_get_user_for_session_uses_indexes(db: Session, connection: Connection) -> None:
+    with captured_statements(connection) as statements:
+        get_user_for_session(db, seed_id(_SESSION, 0))
+    assert_all_indexed(connection, statements)
+
+
+def test_login_uses_indexes(db: Session, connection: Connection) -> None:
+    payload = LoginRequest(email=seed_email(0), password=SEED_PASSWORD)
+    with captured_statements(connection) as statements:
+        login(payload, Response(), db)
+    assert_all_indexed(connection, statements)
+
+
+def test_get_lobby_details_uses_indexes(db: Session, connection: Connection) -> None:
+    dm = db.get(User, seed_id(_USER, 0))
+    lobby_id = seed_id(_LOBBY, 0)
+    with captured_statements(connection) as statements:
+        role = get_lobby_role(lobby_id, db, dm)
+        get_lobby_details(lobby_id, db, role)
+    assert_all_indexed(connection, statements)
+
+
+def test_create_email_invite_uses_indexes(db: Session, connection: Connection) -> None:
+    dm = db.get(User, seed_id(_USER, 0))
+    lobby_id = seed_id(_LOBBY, 0)
+    payload = EmailInviteCreateRequest(target_email=f"plan-{uuid.uuid4().hex}@example.com")
+    request = MagicMock()
+    request.base_url = "http://testserver/"
+    with captured_statements(connection) as statements:
+        role = get_lobby_role(lobby_id, db, dm)
+        create_email_invite(lobby_id, payload, request, db, dm, role, idempotency_key=None)
+    assert_all_indexed(connection, statements)
+
+
+def test_revoke_user_sessions_uses_indexes(db: Session, connection: Connection) -> None:
+    with captured_statements(connection) as statements:
+        revoke_user_sessions(db, seed_id(_USER, 0))
+    assert_all_indexed(connection, statements)
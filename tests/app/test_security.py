@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.membership import lobby_role_cache
+from app.models import AccountType, LobbyRole, User
+from app.models import Session as DbSession
+from app.security import get_user_for_session, revoke_user_sessions
+
+
+@pytest.fixture(autouse=True)
+def _clear_role_cache():
+    yield
+    lobby_role_cache.clear()
+
+
+def _user(db: Session, email: str) -> User:
+    user = User(email=email, password_hash="x", display_name=email, account_type=AccountType.PLAYER)
+    db.add(user)
+    db.flush()
+    return user
+
+
+def test_revoke_user_sessions_revokes_only_live_sessions_of_that_user(db: Session) -> None:
+    """One UPDATE revokes every live session of the user and reports the count."""
+    now = datetime.utcnow()
+    victim = _user(db, "victim@test.com")
+    bystander = _user(db, "bystander@test.com")
+    victim_sessions = [DbSession(user_id=victim.id, expires_at=now + timedelta(days=1)) for _ in range(3)]
+    already_revoked = DbSession(user_id=victim.id, expires_at=now + timedelta(days=1), revoked_at=now)
+    bystander_session = DbSession(user_id=bystander.id, expires_at=now + timedelta(days=1))
+    db.add_all([*victim_sessions, already_revoked, bystander_session])
+    db.commit()
+    session_ids = [s.id for s in victim_sessions]
+    lobby_role_cache.set(victim.id, {"lobby-1": LobbyRole.PLAYER})
+
+    assert revoke_user_sessions(db, victim.id) == 3
+
+    assert all(get_user_for_session(db, session_id) is None for session_id in session_ids)
+    assert get_user_for_session(db, bystander_session.id).id == bystander.id
+    assert lobby_role_cache.get(victim.id) is None
+    assert db.execute(select(DbSession.revoked_at).where(DbSession.id == already_revoked.id)).scalar_one() == now
+    assert revoke_user_sessions(db, victim.id) == 0
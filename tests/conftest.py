@@ -0,0 +1,57 @@
+from collections.abc import Callable, Iterator
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from app.db import Base, get_db
+from app.membership import lobby_role_cache
+from app.models import Session as DbSession
+from app.models import User
+from main import create_app
+
+
+@pytest.fixture
+def session_factory(tmp_path) -> Iterator[sessionmaker[Session]]:
+    """A fresh SQLite file database with every table created."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"timeout": 30})
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine, class_=Session, autocommit=False, autoflush=False)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(session_factory: sessionmaker[Session]) -> Iterator[Session]:
+    with session_factory() as session:
+        yield session
+
+
+@pytest.fixture
+def client(session_factory: sessionmaker[Session]) -> Iterator[TestClient]:
+    """The full app, with `get_db` bound to the test database; startup hooks are not run."""
+    app = create_app()
+
+    def override_get_db() -> Iterator[Session]:
+        with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    lobby_role_cache.clear()
+
+
+@pytest.fixture
+def login(client: TestClient, db: Session) -> Callable[[User], str]:
+    """Opens a session for `user` and sends its cookie on every later `client` request."""
+
+    def login_as(user: User) -> str:
+        session = DbSession(user_id=user.id, expires_at=datetime.utcnow() + timedelta(days=1))
+        db.add(session)
+        db.commit()
+        client.cookies.set(settings.session_cookie_name, session.id)
+        return session.id
+
+    return login_as